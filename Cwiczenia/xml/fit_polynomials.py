@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 """Generate polynomial fits for Moodle calculated question formulas.
-Uses CoolProp for reference data, numpy for polynomial fitting."""
+Uses CoolProp (via tools/property_engine.py) for reference data, numpy for polynomial fitting."""
+import argparse
 import numpy as np
+import os
 import sys
 
 # Use the virtualenv
 sys.path.insert(0, '/Users/marekurbaniak/.virtualenvs/termo/lib/python3.13/site-packages')
-from CoolProp.CoolProp import PropsSI, HAPropsSI
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools'))
+import engine_stats
+from property_engine import evaluate, saturation_rows
+
+parser = argparse.ArgumentParser(description="Polynomial fits for Moodle formulas.")
+parser.add_argument("--stats", metavar="PATH",
+                    help="property-call report path (default: .cache/reports/)")
+args = parser.parse_args()
 
 print("=" * 70)
 print("POLYNOMIAL FITS FOR MOODLE XML FORMULAS")
@@ -22,8 +31,7 @@ tt = np.arange(200, 310, 10)  # °C
 P, T = np.meshgrid(pp, tt)
 P_flat = P.flatten()
 T_flat = T.flatten()
-h_flat = np.array([PropsSI("H", "P", p*1e5, "T", t+273.15, "Water")/1000 
-                    for p, t in zip(P_flat, T_flat)])
+h_flat, s_flat = (x / 1000 for x in evaluate("Water", ["H", "S"], p=P_flat*1e5, t=T_flat+273.15))
 
 # Fit: h ≈ a0 + a1*T + a2*p + a3*T*p + a4*T² + a5*p²
 A = np.column_stack([np.ones_like(P_flat), T_flat, P_flat, T_flat*P_flat, T_flat**2, P_flat**2])
@@ -37,8 +45,6 @@ print(f"  Max error: {err:.2f} kJ/kg ({err/np.mean(h_flat)*100:.3f}%)")
 # 2. WATER/STEAM — s(p,T) superheated
 # ============================================================
 print("\n--- s_steam(p, T) [kJ/(kgK)] --- range: p=8..16 bar, T=200..300°C")
-s_flat = np.array([PropsSI("S", "P", p*1e5, "T", t+273.15, "Water")/1000 
-                    for p, t in zip(P_flat, T_flat)])
 coef_s, _, _, _ = np.linalg.lstsq(A, s_flat, rcond=None)
 s_pred = A @ coef_s
 err_s = np.max(np.abs(s_flat - s_pred))
@@ -51,7 +57,7 @@ print(f"  Max error: {err_s:.5f} kJ/(kgK) ({err_s/np.mean(s_flat)*100:.3f}%)")
 # ============================================================
 print("\n--- h_water(T) sat. liquid [kJ/kg] --- range: T=40..80°C")
 tw = np.arange(40, 85, 5)
-hw = np.array([PropsSI("H", "T", t+273.15, "Q", 0, "Water")/1000 for t in tw])
+hw, sw = (x / 1000 for x in evaluate("Water", ["H", "S"], t=tw+273.15, q=0))
 coef_hw = np.polyfit(tw, hw, 2)
 hw_pred = np.polyval(coef_hw, tw)
 err_hw = np.max(np.abs(hw - hw_pred))
@@ -65,15 +71,15 @@ print(f"  Poly max error: {err_hw:.3f} kJ/kg")
 # ============================================================
 print("\n--- Tsat(p) [°C] --- range: p=1..16 bar")
 ps = np.arange(1, 17, 1)
-Ts = np.array([PropsSI("T", "P", p*1e5, "Q", 0, "Water")-273.15 for p in ps])
+Ts = evaluate("Water", ["T"], p=ps*1e5, q=0)[0] - 273.15
 coef_Ts = np.polyfit(ps, Ts, 3)
 Ts_pred = np.polyval(coef_Ts, ps)
 err_Ts = np.max(np.abs(Ts - Ts_pred))
 print(f"  Tsat = {coef_Ts[0]:.6f}*p^3 + {coef_Ts[1]:.4f}*p^2 + {coef_Ts[2]:.4f}*p + {coef_Ts[3]:.4f}")
 print(f"  Max error: {err_Ts:.2f} °C")
 # Verify
-for p in [1, 2, 4, 8, 10, 12, 16]:
-    real = PropsSI("T", "P", p*1e5, "Q", 0, "Water")-273.15
+p_check = np.array([1, 2, 4, 8, 10, 12, 16])
+for p, real in zip(p_check, evaluate("Water", ["T"], p=p_check*1e5, q=0)[0] - 273.15):
     pred = np.polyval(coef_Ts, p)
     print(f"    p={p:2d} bar: real={real:.1f}, poly={pred:.1f}, Δ={abs(real-pred):.1f}°C")
 
@@ -83,10 +89,11 @@ for p in [1, 2, 4, 8, 10, 12, 16]:
 # ============================================================
 print("\n--- Saturation props h'/h''/s'/s'' vs p [bar] --- range: p=0.5..6")
 ps2 = np.arange(0.5, 6.5, 0.5)
-hf = np.array([PropsSI("H", "P", p*1e5, "Q", 0, "Water")/1000 for p in ps2])
-hg = np.array([PropsSI("H", "P", p*1e5, "Q", 1, "Water")/1000 for p in ps2])
-sf = np.array([PropsSI("S", "P", p*1e5, "Q", 0, "Water")/1000 for p in ps2])
-sg = np.array([PropsSI("S", "P", p*1e5, "Q", 1, "Water")/1000 for p in ps2])
+sat2 = saturation_rows("Water", p=ps2*1e5)
+hf = sat2['h_liq']/1000
+hg = sat2['h_vap']/1000
+sf = sat2['s_liq']/1000
+sg = sat2['s_vap']/1000
 
 for name, data in [("hf", hf), ("hg", hg), ("sf", sf), ("sg", sg)]:
     c = np.polyfit(ps2, data, 3)
@@ -100,9 +107,10 @@ for name, data in [("hf", hf), ("hg", hg), ("sf", sf), ("sg", sg)]:
 # ============================================================
 print("\n--- R134a h/s at saturation --- range: T=-5..55°C")
 tr = np.arange(-5, 56, 1)
-h1r = np.array([PropsSI("H", "T", t+273.15, "Q", 1, "R134a")/1000 for t in tr])
-h3r = np.array([PropsSI("H", "T", t+273.15, "Q", 0, "R134a")/1000 for t in tr])
-s1r = np.array([PropsSI("S", "T", t+273.15, "Q", 1, "R134a")/1000 for t in tr])
+sat_r = saturation_rows("R134a", t=tr+273.15)
+h1r = sat_r['h_vap']/1000
+h3r = sat_r['h_liq']/1000
+s1r = sat_r['s_vap']/1000
 
 c_h1r = np.polyfit(tr, h1r, 2)
 c_h3r = np.polyfit(tr, h3r, 2)
@@ -122,13 +130,9 @@ tk_range = np.arange(35, 56, 1)
 TO, TK = np.meshgrid(to_range, tk_range)
 to_f = TO.flatten()
 tk_f = TK.flatten()
-h2s_f = []
-for to, tk in zip(to_f, tk_f):
-    s1 = PropsSI("S", "T", to+273.15, "Q", 1, "R134a")
-    Pk = PropsSI("P", "T", tk+273.15, "Q", 0, "R134a")
-    h2 = PropsSI("H", "P", Pk, "S", s1, "R134a") / 1000
-    h2s_f.append(h2)
-h2s_f = np.array(h2s_f)
+s1 = evaluate("R134a", ["S"], t=to_f+273.15, q=1)[0]
+Pk = evaluate("R134a", ["P"], t=tk_f+273.15, q=0)[0]
+h2s_f = evaluate("R134a", ["H"], p=Pk, s=s1)[0] / 1000
 
 A2 = np.column_stack([np.ones_like(to_f), to_f, tk_f, to_f*tk_f, to_f**2, tk_f**2])
 c_h2s, _, _, _ = np.linalg.lstsq(A2, h2s_f, rcond=None)
@@ -142,7 +146,7 @@ print(f"  Max error: {err:.2f} kJ/kg ({err/np.mean(h2s_f)*100:.3f}%)")
 # ============================================================
 print("\n--- R134a v_sat_vapor(T) [m³/kg] --- range: T=-5..5°C")
 to_v = np.arange(-5, 6, 1)
-v_r = np.array([1/PropsSI("D", "T", t+273.15, "Q", 1, "R134a") for t in to_v])
+v_r = 1/evaluate("R134a", ["D"], t=to_v+273.15, q=1)[0]
 c_v = np.polyfit(to_v, v_r, 2)
 pred_v = np.polyval(c_v, to_v)
 err_v = np.max(np.abs(v_r - pred_v))
@@ -152,8 +156,9 @@ print(f"  v(T) = {c_v[0]:.10f}*T^2 + {c_v[1]:.8f}*T + {c_v[2]:.6f}  (max err: {e
 # 9. R290 (Propane) — same props
 # ============================================================
 print("\n--- R290 h/s at saturation for EER comparison ---")
-h1_290 = np.array([PropsSI("H", "T", t+273.15, "Q", 1, "R290")/1000 for t in tr])
-h3_290 = np.array([PropsSI("H", "T", t+273.15, "Q", 0, "R290")/1000 for t in tr])
+sat_290 = saturation_rows("R290", t=tr+273.15)
+h1_290 = sat_290['h_vap']/1000
+h3_290 = sat_290['h_liq']/1000
 c_h1_290 = np.polyfit(tr, h1_290, 2)
 c_h3_290 = np.polyfit(tr, h3_290, 2)
 for name, c, data in [("h_g R290(T)", c_h1_290, h1_290), ("h_f R290(T)", c_h3_290, h3_290)]:
@@ -162,13 +167,9 @@ for name, c, data in [("h_g R290(T)", c_h1_290, h1_290), ("h_f R290(T)", c_h3_29
     print(f"  {name} = {c[0]:.8f}*T^2 + {c[1]:.6f}*T + {c[2]:.4f}  (max err: {err:.3f})")
 
 # R290 h2s(to, tk)
-h2s_290 = []
-for to, tk in zip(to_f, tk_f):
-    s1 = PropsSI("S", "T", to+273.15, "Q", 1, "R290")
-    Pk = PropsSI("P", "T", tk+273.15, "Q", 0, "R290")
-    h2 = PropsSI("H", "P", Pk, "S", s1, "R290") / 1000
-    h2s_290.append(h2)
-h2s_290 = np.array(h2s_290)
+s1 = evaluate("R290", ["S"], t=to_f+273.15, q=1)[0]
+Pk = evaluate("R290", ["P"], t=tk_f+273.15, q=0)[0]
+h2s_290 = evaluate("R290", ["H"], p=Pk, s=s1)[0] / 1000
 c_h2s_290, _, _, _ = np.linalg.lstsq(A2, h2s_290, rcond=None)
 pred_290 = A2 @ c_h2s_290
 err_290 = np.max(np.abs(h2s_290 - pred_290))
@@ -194,7 +195,6 @@ print(f"  hg(p) = {c_hg3[0]:.4f}*p^3 + ({c_hg3[1]:.4f})*p^2 + {c_hg3[2]:.4f}*p +
 print(f"\nCw03_Zad3_7: ds = s_steam(p,T) - s_water(T)")
 print(f"  s_steam = {coef_s[0]:.4f} + {coef_s[1]:.6f}*{{tp}} + ({coef_s[2]:.6f})*{{pk}} + ({coef_s[3]:.8f})*{{tp}}*{{pk}} + ({coef_s[4]:.10f})*pow({{tp}},2) + ({coef_s[5]:.8f})*pow({{pk}},2)")
 # s_water (sat liquid) fit
-sw = np.array([PropsSI("S", "T", t+273.15, "Q", 0, "Water")/1000 for t in tw])
 c_sw = np.polyfit(tw, sw, 2)
 print(f"  s_water(T) = {c_sw[0]:.8f}*T^2 + {c_sw[1]:.6f}*T + {c_sw[2]:.4f}")
 
@@ -217,3 +217,5 @@ print(f"  h2s(to,tk) = {c_h2s[0]:.4f} + ({c_h2s[1]:.6f})*to + {c_h2s[2]:.6f}*tk
 print(f"  v_g(T) = {c_v[0]:.8f}*T^2 + ({c_v[1]:.6f})*T + {c_v[2]:.6f}")
 
 print("\nDONE.")
+print(engine_stats.summary())
+print(f"Stats report: {engine_stats.write_report('fit_polynomials', args.stats)}")
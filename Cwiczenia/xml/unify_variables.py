@@ -8,7 +8,10 @@ import xml.etree.ElementTree as ET
 import random
 import math
 import os
-import copy
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools'))
+from question_bank import QuestionBank
 
 random.seed(42)  # Reproducible
 
@@ -143,8 +146,35 @@ def make_dataset_def_xml(name, vmin, vmax, decimals, values, status="shared"):
     
     return dd
 
+def update_definition(dd, var_info):
+    """Replace a dataset_definition's range and items with the unified pool."""
+    vname, vmin, vmax, dec, step = var_info
+    dd.find('minimum/text').text = format_val(vmin, dec)
+    dd.find('maximum/text').text = format_val(vmax, dec)
+    dd.find('decimals/text').text = str(dec)
+    # Update items
+    items_el = dd.find('dataset_items')
+    if items_el is not None:
+        dd.remove(items_el)
+    items_el = ET.SubElement(dd, 'dataset_items')
+    for i, v in enumerate(all_values[vname], 1):
+        item = ET.SubElement(items_el, 'dataset_item')
+        num = ET.SubElement(item, 'number')
+        num.text = str(i)
+        val_el = ET.SubElement(item, 'value')
+        val_el.text = format_val(v, dec)
+    # Update counts
+    ic = dd.find('itemcount')
+    if ic is not None:
+        ic.text = str(N_ITEMS)
+    noi = dd.find('number_of_items')
+    if noi is not None:
+        noi.text = str(N_ITEMS)
+    print(f"  Updated: {vname}")
+
 # ========================= GENERATE ALL VALUES =========================
 print("Generating unified variable pool...")
+VAR_INFO = {v[0]: v for v in VARS}
 all_values = {}
 for name, vmin, vmax, dec, step in VARS:
     all_values[name] = gen_values(vmin, vmax, dec, step)
@@ -161,72 +191,33 @@ for fname in sorted(os.listdir(xml_dir)):
     print(f"\n{'='*60}")
     print(f"Processing: {fname}")
     
-    # Parse with ET, preserving structure
-    tree = ET.parse(fpath)
-    root = tree.getroot()
+    # Parse once; questions and dataset definitions are indexed
+    bank = QuestionBank.load(fpath)
     
     is_cw01 = fname.startswith("Cw01")
     
     # Track which vars are already defined in this file
-    existing_vars = set()
-    for dd in root.findall('.//dataset_definition'):
-        vname = dd.find('name/text').text
-        existing_vars.add(vname)
+    existing_vars = set(bank.variables())
     
     print(f"  Existing vars: {sorted(existing_vars)}")
     
     # For CW01: add ALL missing variables to the FIRST calculated question
     if is_cw01:
-        first_q = None
-        for q in root.findall('question'):
-            if q.attrib.get('type') == 'calculated':
-                first_q = q
-                break
-        
-        if first_q is not None:
-            dds_el = first_q.find('dataset_definitions')
-            if dds_el is None:
-                dds_el = ET.SubElement(first_q, 'dataset_definitions')
+        calculated = bank.of_type('calculated')
+        if calculated:
+            first_q = calculated[0]
             
             # First, update existing variable definitions with new values
-            for dd in dds_el.findall('dataset_definition'):
-                vname = dd.find('name/text').text
-                if vname in all_values:
-                    # Update the dataset_items with our generated values
-                    var_info = next((v for v in VARS if v[0] == vname), None)
-                    if var_info:
-                        _, vmin, vmax, dec, step = var_info
-                        # Update min/max
-                        dd.find('minimum/text').text = format_val(vmin, dec)
-                        dd.find('maximum/text').text = format_val(vmax, dec)
-                        dd.find('decimals/text').text = str(dec)
-                        # Update items
-                        items_el = dd.find('dataset_items')
-                        if items_el is not None:
-                            dd.remove(items_el)
-                        items_el = ET.SubElement(dd, 'dataset_items')
-                        for i, v in enumerate(all_values[vname], 1):
-                            item = ET.SubElement(items_el, 'dataset_item')
-                            num = ET.SubElement(item, 'number')
-                            num.text = str(i)
-                            val_el = ET.SubElement(item, 'value')
-                            val_el.text = format_val(v, dec)
-                        # Update counts
-                        ic = dd.find('itemcount')
-                        if ic is not None:
-                            ic.text = str(N_ITEMS)
-                        noi = dd.find('number_of_items')
-                        if noi is not None:
-                            noi.text = str(N_ITEMS)
-                        print(f"  Updated: {vname}")
+            for vname, dd in bank.datasets(first_q).items():
+                if vname in VAR_INFO:
+                    update_definition(dd, VAR_INFO[vname])
             
             # Add missing variables
             added = []
             for name, vmin, vmax, dec, step in VARS:
                 if name not in existing_vars:
                     vals = all_values[name]
-                    new_dd = make_dataset_def_xml(name, vmin, vmax, dec, vals)
-                    dds_el.append(new_dd)
+                    bank.add_dataset(first_q, make_dataset_def_xml(name, vmin, vmax, dec, vals))
                     added.append(name)
             
             if added:
@@ -234,43 +225,13 @@ for fname in sorted(os.listdir(xml_dir)):
     
     else:
         # For Cw02-Cw07: update existing variable definitions with unified values
-        for q in root.findall('question'):
-            if q.attrib.get('type') != 'calculated':
-                continue
-            dds_el = q.find('dataset_definitions')
-            if dds_el is None:
-                continue
-            
-            for dd in dds_el.findall('dataset_definition'):
-                vname = dd.find('name/text').text
-                if vname in all_values:
-                    var_info = next((v for v in VARS if v[0] == vname), None)
-                    if var_info:
-                        _, vmin, vmax, dec, step = var_info
-                        dd.find('minimum/text').text = format_val(vmin, dec)
-                        dd.find('maximum/text').text = format_val(vmax, dec)
-                        dd.find('decimals/text').text = str(dec)
-                        items_el = dd.find('dataset_items')
-                        if items_el is not None:
-                            dd.remove(items_el)
-                        items_el = ET.SubElement(dd, 'dataset_items')
-                        for i, v in enumerate(all_values[vname], 1):
-                            item = ET.SubElement(items_el, 'dataset_item')
-                            num = ET.SubElement(item, 'number')
-                            num.text = str(i)
-                            val_el = ET.SubElement(item, 'value')
-                            val_el.text = format_val(v, dec)
-                        ic = dd.find('itemcount')
-                        if ic is not None:
-                            ic.text = str(N_ITEMS)
-                        noi = dd.find('number_of_items')
-                        if noi is not None:
-                            noi.text = str(N_ITEMS)
-                        print(f"  Updated: {vname}")
+        for q in bank.of_type('calculated'):
+            for vname, dd in bank.datasets(q).items():
+                if vname in VAR_INFO:
+                    update_definition(dd, VAR_INFO[vname])
     
-    # Write back
-    ET.indent(tree, space="    ")
-    tree.write(fpath, encoding='UTF-8', xml_declaration=True)
+    # Write back (HTML fields as CDATA)
+    bank.write(fpath)
     print(f"  Written: {fname}")
 
 print("\n" + "="*60)
@@ -4,8 +4,11 @@ update_xml_formulas.py
 Update Moodle XML calculated question formulas with polynomial
 approximations from CoolProp. Also add missing questions.
 """
-import xml.etree.ElementTree as ET
-import os, copy, re
+import os, copy, re, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools'))
+from question_bank import QuestionBank
+from question_templates import calculated_question
 
 XML_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -57,122 +60,52 @@ def update_answer(question, new_formula):
         ans.text = new_formula
 
 
-def find_question(root, name_text):
-    """Find question by name."""
-    for q in root.findall('.//question'):
-        n = q.find('name/text')
-        if n is not None and n.text == name_text:
-            return q
-    return None
-
-
-def get_dataset_def(question):
-    """Get the first dataset_definitions element."""
-    return question.find('.//dataset_definitions')
-
-
-def copy_dataset_item(source_q, var_name, target_q):
+def copy_dataset_item(bank, source_q, var_name, target_q):
     """Copy a shared variable's dataset_definition from source to target question."""
-    src_defs = source_q.find('.//dataset_definitions')
-    if src_defs is None:
-        return
-    for dd in src_defs.findall('dataset_definition'):
-        status = dd.find('status')
-        name = dd.find('name/text')
-        if name is not None and name.text == var_name:
-            tgt_defs = target_q.find('.//dataset_definitions')
-            if tgt_defs is None:
-                tgt_defs = ET.SubElement(target_q, 'dataset_definitions')
-            tgt_defs.append(copy.deepcopy(dd))
-            return
+    dd = bank.dataset(source_q, var_name)
+    if dd is not None:
+        bank.add_dataset(target_q, copy.deepcopy(dd))
 
 
 def make_calculated_question(name, questiontext, formula, tolerance, 
                               tolerancetype=1, correctanswerformat=1, 
                               correctanswerlength=2, vars_from=None):
-    """Create a new calculated question element."""
-    q = ET.Element('question', type='calculated')
-    
-    n = ET.SubElement(q, 'name')
-    nt = ET.SubElement(n, 'text')
-    nt.text = name
-    
-    qt = ET.SubElement(q, 'questiontext', format='html')
-    qtt = ET.SubElement(qt, 'text')
-    qtt.text = f'<![CDATA[<p>{questiontext}</p>]]>'
-    
-    gf = ET.SubElement(q, 'generalfeedback', format='html')
-    gft = ET.SubElement(gf, 'text')
-    
-    dg = ET.SubElement(q, 'defaultgrade')
-    dg.text = '1.0000000'
-    pen = ET.SubElement(q, 'penalty')
-    pen.text = '0.3333333'
-    hid = ET.SubElement(q, 'hidden')
-    hid.text = '0'
-    syn = ET.SubElement(q, 'synchronize')
-    syn.text = '1'
-    single = ET.SubElement(q, 'single')
-    single.text = '0'
-    answernumbering = ET.SubElement(q, 'answernumbering')
-    answernumbering.text = 'abc'
-    shuffleanswers = ET.SubElement(q, 'shuffleanswers')
-    shuffleanswers.text = '0'
-    correctanswerformat_e = ET.SubElement(q, 'correctanswerformat')
-    correctanswerformat_e.text = str(correctanswerformat)
-    correctanswerlength_e = ET.SubElement(q, 'correctanswerlength')
-    correctanswerlength_e.text = str(correctanswerlength)
-    
-    ans = ET.SubElement(q, 'answer', fraction='100', format='moodle_auto_format')
-    at = ET.SubElement(ans, 'text')
-    at.text = formula
-    tol = ET.SubElement(ans, 'tolerance')
-    tol.text = str(tolerance)
-    tt = ET.SubElement(ans, 'tolerancetype')
-    tt.text = str(tolerancetype)
-    caf = ET.SubElement(ans, 'correctanswerformat')
-    caf.text = str(correctanswerformat)
-    cal = ET.SubElement(ans, 'correctanswerlength')
-    cal.text = str(correctanswerlength)
-    fb = ET.SubElement(ans, 'feedback', format='html')
-    fbt = ET.SubElement(fb, 'text')
-    
-    # Dataset definitions
-    dds = ET.SubElement(q, 'dataset_definitions')
-    
-    return q
+    """Create a new calculated question element (datasets are copied in by the caller)."""
+    return calculated_question(name, f'<p>{questiontext}</p>', formula, tolerance,
+                               synchronize=1, tolerancetype=tolerancetype,
+                               correctanswerformat=correctanswerformat,
+                               correctanswerlength=correctanswerlength)
 
 
 def process_cw03(filepath):
     """Update Cw03 formulas and add missing questions."""
-    tree = ET.parse(filepath)
-    root = tree.getroot()
+    bank = QuestionBank.load(filepath)
     
     # === Update existing formulas ===
     
     # Zad 3.2 — Moc kotła: use h_steam polynomial
-    q32 = find_question(root, 'Cw03_Zad3_2_Moc_kotla')
+    q32 = bank.question('Cw03_Zad3_2_Moc_kotla')
     if q32:
         formula = f"{{md}} * 1000 / 3600 * (({H_STEAM}) - 4.19 * {{tz}})"
         update_answer(q32, formula)
         print("  ✓ Updated Cw03_Zad3_2 formula (h_steam polynomial)")
     
     # Zad 3.3 — Zuzycie gazu: depends on 3.2's Q
-    q33 = find_question(root, 'Cw03_Zad3_3_Zuzycie_gazu')
+    q33 = bank.question('Cw03_Zad3_3_Zuzycie_gazu')
     if q33:
         formula = f"{{md}} * 1000 / 3600 * (({H_STEAM}) - 4.19 * {{tz}}) / ({{ek}} * 50000 * 0.7) * 3600"
         update_answer(q33, formula)
         print("  ✓ Updated Cw03_Zad3_3 formula")
     
     # Zad 3.5 — Stopien suchosci: use hf(p), hg(p) polynomials
-    q35 = find_question(root, 'Cw03_Zad3_5_Stopien_suchosci')
+    q35 = bank.question('Cw03_Zad3_5_Stopien_suchosci')
     if q35:
         formula = f"({{hm}} - ({HF_P})) / (({HG_P}) - ({HF_P}))"
         update_answer(q35, formula)
         print("  ✓ Updated Cw03_Zad3_5 formula (hf/hg polynomials)")
     
     # Zad 3.7 — Entropia: use s_steam and s_water polynomials
-    q37 = find_question(root, 'Cw03_Zad3_7_Entropia_kotla')
+    q37 = bank.question('Cw03_Zad3_7_Entropia_kotla')
     if q37:
         formula = f"{{md}} * 1000 / 3600 * (({S_STEAM}) - ({S_WATER}))"
         update_answer(q37, formula)
@@ -187,9 +120,9 @@ def process_cw03(filepath):
     # For now, add as a simple question with Tsat
     
     # === Add missing question: Zad 3.8 (Kondensat) ===
-    q_template = find_question(root, 'Cw03_Zad3_2_Moc_kotla')  # use as template for vars
+    q_template = bank.question('Cw03_Zad3_2_Moc_kotla')  # use as template for vars
     
-    if not find_question(root, 'Cw03_Zad3_8_Bilans_kondensatu'):
+    if not bank.question('Cw03_Zad3_8_Bilans_kondensatu'):
         q38 = make_calculated_question(
             'Cw03_Zad3_8_Bilans_kondensatu',
             'Wymiennik ciepła skrapla parę z parametrów kotłowych do stanu cieczy nasyconej przy ciśnieniu dławienia {pdl} bar. '
@@ -198,21 +131,20 @@ def process_cw03(filepath):
             5,  # tolerance 5 kW
             tolerancetype=1, correctanswerlength=1
         )
+        bank.add(q38)
         # Copy dataset vars from existing question
         if q_template:
             for var in ['md', 'pk', 'tp', 'tz', 'ek', 'pdl']:
-                copy_dataset_item(q_template, var, q38)
-        root.append(q38)
+                copy_dataset_item(bank, q_template, var, q38)
         print("  + Added Cw03_Zad3_8_Bilans_kondensatu")
     
-    tree.write(filepath, encoding='unicode', xml_declaration=True)
+    bank.write(filepath)
     return True
 
 
 def process_cw04(filepath):
     """Update Cw04 formulas with polynomial approximations."""
-    tree = ET.parse(filepath)
-    root = tree.getroot()
+    bank = QuestionBank.load(filepath)
     
     # Use p1t/t1t for inlet steam, p2t for outlet
     # h_steam at inlet uses pk→p1t, tp→t1t variable mapping
@@ -220,7 +152,7 @@ def process_cw04(filepath):
     S_INLET = S_STEAM.replace('{pk}', '{p1t}').replace('{tp}', '{t1t}')
     
     # Zad 4.3 — Moc idealna
-    q43 = find_question(root, 'Cw04_Zad4_3_Moc_turbiny_idealna')
+    q43 = bank.question('Cw04_Zad4_3_Moc_turbiny_idealna')
     if q43:
         # x_is = (s1 - sf(p2)) / (sg(p2) - sf(p2))
         # h2s = hf(p2) + x_is * (hg(p2) - hf(p2))
@@ -235,7 +167,7 @@ def process_cw04(filepath):
         print("  ✓ Updated Cw04_Zad4_3 formula (full polynomial)")
     
     # Zad 4.4 — Moc rzeczywista 
-    q44 = find_question(root, 'Cw04_Zad4_4_Moc_rzeczywista')
+    q44 = bank.question('Cw04_Zad4_4_Moc_rzeczywista')
     if q44:
         # N_real = eis * N_ideal
         h2s_expr = (f"(({HF_P2}) + (({S_INLET}) - ({SF_P})) / (({SG_P}) - ({SF_P})) * (({HG_P2}) - ({HF_P2})))")
@@ -244,59 +176,58 @@ def process_cw04(filepath):
         print("  ✓ Updated Cw04_Zad4_4 formula")
     
     # Zad 4.4b — Entalpia rzeczywista
-    q44b = find_question(root, 'Cw04_Zad4_4b_Entalpia_rzeczywista')
+    q44b = bank.question('Cw04_Zad4_4b_Entalpia_rzeczywista')
     if q44b:
         h2s_expr = (f"(({HF_P2}) + (({S_INLET}) - ({SF_P})) / (({SG_P}) - ({SF_P})) * (({HG_P2}) - ({HF_P2})))")
         formula = f"({H_INLET}) - {{eis}} * (({H_INLET}) - {h2s_expr})"
         update_answer(q44b, formula)
         print("  ✓ Updated Cw04_Zad4_4b formula")
     
-    tree.write(filepath, encoding='unicode', xml_declaration=True)
+    bank.write(filepath)
     return True
 
 
 def process_cw06(filepath):
     """Update Cw06 R134a formulas with polynomial approximations."""
-    tree = ET.parse(filepath)
-    root = tree.getroot()
+    bank = QuestionBank.load(filepath)
     
     # Zad 6.1 — EER
-    q61 = find_question(root, 'Cw06_Zad6_1_EER')
+    q61 = bank.question('Cw06_Zad6_1_EER')
     if q61:
         formula = f"(({H1_R134A}) - ({H3_R134A})) / (({H2S_R134A}) - ({H1_R134A}))"
         update_answer(q61, formula)
         print("  ✓ Updated Cw06_Zad6_1 EER formula (R134a polynomials)")
     
     # Zad 6.2 — Moc sprężarki
-    q62 = find_question(root, 'Cw06_Zad6_2_Moc_sprezarki')
+    q62 = bank.question('Cw06_Zad6_2_Moc_sprezarki')
     if q62:
         formula = f"{{Qo6}} / ((({H1_R134A}) - ({H3_R134A})) / (({H2S_R134A}) - ({H1_R134A})))"
         update_answer(q62, formula)
         print("  ✓ Updated Cw06_Zad6_2")
     
     # Zad 6.3 — Strumien masy
-    q63 = find_question(root, 'Cw06_Zad6_3_Strumien_masy')
+    q63 = bank.question('Cw06_Zad6_3_Strumien_masy')
     if q63:
         formula = f"{{Qo6}} / (({H1_R134A}) - ({H3_R134A}))"
         update_answer(q63, formula)
         print("  ✓ Updated Cw06_Zad6_3")
     
     # Zad 6.4 — COP pompy ciepła
-    q64 = find_question(root, 'Cw06_Zad6_4_COP_pompa_ciepla')
+    q64 = bank.question('Cw06_Zad6_4_COP_pompa_ciepla')
     if q64:
         formula = f"(({H1_R134A}) - ({H3_R134A})) / (({H2S_R134A}) - ({H1_R134A})) + 1"
         update_answer(q64, formula)
         print("  ✓ Updated Cw06_Zad6_4")
     
     # Zad 6.7 — Prędkość rurociągu (now uses v polynomial instead of 0.08)
-    q67 = find_question(root, 'Cw06_Zad6_7_Predkosc_rurociagu')
+    q67 = bank.question('Cw06_Zad6_7_Predkosc_rurociagu')
     if q67:
         formula = f"({{Qo6}} / (({H1_R134A}) - ({H3_R134A}))) * ({V_R134A}) / (3.14159265 * pow({{dr6}} / 1000, 2) / 4)"
         update_answer(q67, formula)
         print("  ✓ Updated Cw06_Zad6_7 (v_g polynomial)")
     
     # Add missing: Zad 6.6 — R134a vs R290
-    if not find_question(root, 'Cw06_Zad6_6_EER_R290'):
+    if not bank.question('Cw06_Zad6_6_EER_R290'):
         q66 = make_calculated_question(
             'Cw06_Zad6_6_EER_R290',
             'Porównaj EER obiegu chłodniczego z propanu (R290) pracującego między temperaturami '
@@ -305,31 +236,30 @@ def process_cw06(filepath):
             0.3,
             correctanswerlength=2
         )
-        q_template = find_question(root, 'Cw06_Zad6_1_EER')
+        bank.add(q66)
+        q_template = bank.question('Cw06_Zad6_1_EER')
         if q_template:
             for var in ['to6', 'tk6', 'Qo6', 'dr6']:
-                copy_dataset_item(q_template, var, q66)
-        root.append(q66)
+                copy_dataset_item(bank, q_template, var, q66)
         print("  + Added Cw06_Zad6_6_EER_R290")
     
-    tree.write(filepath, encoding='unicode', xml_declaration=True)
+    bank.write(filepath)
     return True
 
 
 def process_cw07(filepath):
     """Update Cw07 formulas — HVAC uses cp*ΔT approximation which is OK for dry air."""
-    tree = ET.parse(filepath)
-    root = tree.getroot()
+    bank = QuestionBank.load(filepath)
     
     # The existing formulas use cp*ΔT which is a reasonable approximation
     # for dry air processes (Zad 7.1, 7.2 are heating/cooling without moisture change).
     # HAPropsSI would be more accurate but the approximation error is < 5%.
     # We keep current formulas but add missing questions.
     
-    q_template = find_question(root, 'Cw07_Zad8_1_Moc_nagrzewnicy_zima')
+    q_template = bank.question('Cw07_Zad8_1_Moc_nagrzewnicy_zima')
     
     # Add Zad 7.9 Rekuperacja
-    if not find_question(root, 'Cw07_Zad8_9_Rekuperacja'):
+    if not bank.question('Cw07_Zad8_9_Rekuperacja'):
         # Q_rec = ṁ * cp * rec/100 * (t_wewn - t_zima) 
         # This is the heat recovered from exhaust air
         q79 = make_calculated_question(
@@ -340,13 +270,13 @@ def process_cw07(filepath):
             2,
             correctanswerlength=1
         )
+        bank.add(q79)
         if q_template:
             for var in ['Vd8', 'tw8', 'tzz', 'rec8', 'tzl', 'tn8', 'Qj8']:
-                copy_dataset_item(q_template, var, q79)
-        root.append(q79)
+                copy_dataset_item(bank, q_template, var, q79)
         print("  + Added Cw07_Zad8_9_Rekuperacja")
     
-    tree.write(filepath, encoding='unicode', xml_declaration=True)
+    bank.write(filepath)
     return True
 
 
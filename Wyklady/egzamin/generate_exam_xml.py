@@ -5,8 +5,10 @@
 Category: egzamin
 """
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
-import os, random, math
+import os, random, math, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools'))
+import moodle_xml
+from question_templates import add_dataset, calculated_question
 
 random.seed(42)
 OUT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -16,14 +18,9 @@ NUM_DATASETS = 50
 # HELPERS
 # ============================================================
 def write_xml(root, filename):
-    raw = ET.tostring(root, encoding='unicode')
-    dom = minidom.parseString(raw)
-    xml_str = dom.toprettyxml(indent='    ', encoding=None)
-    lines = [l for l in xml_str.split('\n') if not l.strip().startswith('<?xml')]
-    content = "<?xml version='1.0' encoding='UTF-8'?>\n" + '\n'.join(lines)
+    """Stream the <quiz> root's questions to OUT_DIR/filename."""
     path = os.path.join(OUT_DIR, filename)
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    moodle_xml.write_quiz(path, root, declaration="<?xml version='1.0' encoding='UTF-8'?>")
     print(f"  Written: {path}")
 
 def gen_values(vmin, vmax, decimals, n=NUM_DATASETS):
@@ -37,33 +34,10 @@ def gen_values(vmin, vmax, decimals, n=NUM_DATASETS):
         vals.append(v)
     return vals
 
-def add_dataset(parent, name, vmin, vmax, decimals, status='private'):
-    """Add a dataset_definition element with generated items."""
-    dd = ET.SubElement(parent, 'dataset_definition')
-    st = ET.SubElement(dd, 'status')
-    ET.SubElement(st, 'text').text = status
-    nm = ET.SubElement(dd, 'name')
-    ET.SubElement(nm, 'text').text = name
-    ET.SubElement(dd, 'type').text = 'calculated'
-    dist = ET.SubElement(dd, 'distribution')
-    ET.SubElement(dist, 'text').text = 'uniform'
-    mn = ET.SubElement(dd, 'minimum')
-    ET.SubElement(mn, 'text').text = str(vmin)
-    mx = ET.SubElement(dd, 'maximum')
-    ET.SubElement(mx, 'text').text = str(vmax)
-    dec = ET.SubElement(dd, 'decimals')
-    ET.SubElement(dec, 'text').text = str(decimals)
-    ET.SubElement(dd, 'itemcount').text = str(NUM_DATASETS)
-    ET.SubElement(dd, 'number_of_items').text = str(NUM_DATASETS)
-    items_el = ET.SubElement(dd, 'dataset_items')
-    values = gen_values(vmin, vmax, decimals)
-    for i, v in enumerate(values, 1):
-        di = ET.SubElement(items_el, 'dataset_item')
-        ET.SubElement(di, 'number').text = str(i)
-        if decimals == 0:
-            ET.SubElement(di, 'value').text = str(int(v))
-        else:
-            ET.SubElement(di, 'value').text = f'{v:.{decimals}f}'
+def dataset_values(vmin, vmax, decimals):
+    """Generated dataset items as printed strings."""
+    return [str(int(v)) if decimals == 0 else f'{v:.{decimals}f}'
+            for v in gen_values(vmin, vmax, decimals)]
 
 def add_calculated_question(quiz, name, html, formula, tolerance, grade,
                             variables, tol_type=2):
@@ -71,39 +45,10 @@ def add_calculated_question(quiz, name, html, formula, tolerance, grade,
     variables: list of (varname, min, max, decimals)
     formula: Moodle formula string using {varname}
     """
-    q = ET.SubElement(quiz, 'question', type='calculated')
-    q_name = ET.SubElement(q, 'name')
-    ET.SubElement(q_name, 'text').text = name
-    q_qt = ET.SubElement(q, 'questiontext', format='html')
-    ET.SubElement(q_qt, 'text').text = html
-    q_gf = ET.SubElement(q, 'generalfeedback', format='html')
-    ET.SubElement(q_gf, 'text')
-    ET.SubElement(q, 'defaultgrade').text = f'{grade:.7f}'
-    ET.SubElement(q, 'penalty').text = '0.3333333'
-    ET.SubElement(q, 'hidden').text = '0'
-    ET.SubElement(q, 'idnumber')
-    ET.SubElement(q, 'synchronize').text = '0'
-    ET.SubElement(q, 'single').text = '0'
-    ET.SubElement(q, 'answernumbering').text = 'abc'
-    ET.SubElement(q, 'shuffleanswers').text = '0'
-    for tag in ['correctfeedback', 'partiallycorrectfeedback', 'incorrectfeedback']:
-        el = ET.SubElement(q, tag)
-        ET.SubElement(el, 'text')
-    a = ET.SubElement(q, 'answer', fraction='100')
-    ET.SubElement(a, 'text').text = formula
-    ET.SubElement(a, 'tolerance').text = str(tolerance)
-    ET.SubElement(a, 'tolerancetype').text = str(tol_type)
-    ET.SubElement(a, 'correctanswerformat').text = '1'
-    ET.SubElement(a, 'correctanswerlength').text = '4'
-    fb = ET.SubElement(a, 'feedback', format='html')
-    ET.SubElement(fb, 'text')
-    ET.SubElement(q, 'unitgradingtype').text = '0'
-    ET.SubElement(q, 'unitpenalty').text = '0.1000000'
-    ET.SubElement(q, 'showunits').text = '3'
-    ET.SubElement(q, 'unitsleft').text = '0'
-    dds = ET.SubElement(q, 'dataset_definitions')
+    q = calculated_question(name, html, formula, tolerance, grade=grade, tolerancetype=tol_type)
+    quiz.append(q)
     for vname, vmin, vmax, vdec in variables:
-        add_dataset(dds, vname, vmin, vmax, vdec)
+        add_dataset(q, vname, str(vmin), str(vmax), vdec, dataset_values(vmin, vmax, vdec))
 
 # ============================================================
 # 1. TEORIA — multichoice & truefalse (unchanged logic)
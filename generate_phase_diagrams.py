@@ -1,9 +1,15 @@
 
+import argparse
 import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 import CoolProp.CoolProp as CP
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+import engine_stats
+from property_engine import evaluate
+
 def plot_h2o():
     fluid = 'Water'
     
@@ -17,7 +23,7 @@ def plot_h2o():
     
     # 1. Liquid-Vapor Saturation Line (Triple Point to Critical Point)
     T_sat = np.linspace(Tt, Tc, 500)
-    P_sat = [CP.PropsSI('P', 'T', t, 'Q', 0, fluid) for t in T_sat]
+    P_sat = evaluate(fluid, ['P'], t=T_sat, q=0)[0]
     
     # 2. Solid-Liquid Melting Line (Approximate)
     # Water has negative slope, but for standard range it's steep.
@@ -83,20 +89,16 @@ def plot_he4():
     
     # 1. Saturation Line
     T_sat = np.linspace(T_lambda, Tc, 200) # From Lambda to Crit (He I)
-    P_sat = [CP.PropsSI('P', 'T', t, 'Q', 0, fluid) for t in T_sat]
+    P_sat = evaluate(fluid, ['P'], t=T_sat, q=0)[0]
     
     # Start from 1.5K to avoid low-T EOS issues
     T_sat_II = np.linspace(2.0, T_lambda, 50) 
-    P_sat_II = []
-    for t in T_sat_II:
-        try:
-             P_sat_II.append(CP.PropsSI('P', 'T', t, 'Q', 0, fluid))
-        except:
-             P_sat_II.append(None)
-    
-    # Filter Nones
-    T_sat_II = [t for t, p in zip(T_sat_II, P_sat_II) if p is not None]
-    P_sat_II = [p for p in P_sat_II if p is not None]
+    P_sat_II = evaluate(fluid, ['P'], t=T_sat_II, q=0)[0]
+    
+    # Filter states outside the EOS range (NaN)
+    valid = ~np.isnan(P_sat_II)
+    T_sat_II = T_sat_II[valid]
+    P_sat_II = P_sat_II[valid]
 
     # 2. Lambda Line (Transition He I - He II)
     # Approximately vertical or slight slope in p-T?
@@ -151,7 +153,14 @@ def plot_he4():
     plt.close()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the H2O and He-4 phase diagrams.")
+    parser.add_argument("--stats", metavar="PATH",
+                        help="property-call report path (default: .cache/reports/)")
+    args = parser.parse_args()
+
     if not os.path.exists('img'):
         os.makedirs('img')
     plot_h2o()
     plot_he4()
+    print(engine_stats.summary())
+    print(f"Stats report: {engine_stats.write_report('generate_phase_diagrams', args.stats)}")
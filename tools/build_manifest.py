@@ -0,0 +1,111 @@
+"""
+Content-hash manifest for incremental table builds.
+
+A table's digest covers its spec (fluid, ranges), how it is rendered
+(generator, renderer version, title, theme, mode), the data-stage
+version, the CoolProp version and the backend. Rendered HTML fragments
+are kept under .cache/fragments/<digest>.html and the digests of the last
+build per generator in .cache/build/<name>.json. A table whose digest
+matches the manifest and whose fragment exists is spliced from the
+fragment; only the others are evaluated, rendered and exported. The
+sidecar index.json records each table's data_digest(), so sidecars left
+by a build in another mode or with other ranges are rebuilt as well.
+"""
+
+import hashlib
+import json
+import os
+
+import CoolProp
+import numpy as np
+
+import property_engine
+import table_data
+
+CACHE_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+FRAGMENT_DIR = os.path.join(CACHE_ROOT, "fragments")
+MANIFEST_DIR = os.path.join(CACHE_ROOT, "build")
+READ_CHUNK = 1 << 16
+# Fragments are stored with their boundaries so a splice replays exactly what
+# the renderer yielded (the compact Moodle pass works per fragment)
+SEPARATOR = "\0"
+
+
+def _plain(value):
+    """JSON-ready copy of a spec value (arrays become lists of floats)."""
+    if isinstance(value, (np.ndarray, list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def table_digest(spec, *render_args):
+    """SHA-256 over everything that determines a table's fragment and sidecar."""
+    payload = {
+        "spec": {k: _plain(v) for k, v in spec.items()},
+        "render": _plain(render_args),
+        "data_version": table_data.DATA_VERSION,
+        "coolprop": CoolProp.__version__,
+        "backend": property_engine.BACKEND,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def data_digest(spec):
+    """Digest of the table data alone (what the sidecars hold)."""
+    return table_digest(spec)
+
+
+def fragment_path(digest):
+    return os.path.join(FRAGMENT_DIR, f"{digest}.html")
+
+
+def read_fragment(digest):
+    """Yield the stored fragments of a table, reading in chunks."""
+    pending = ""
+    with open(fragment_path(digest), encoding="utf-8") as f:
+        while chunk := f.read(READ_CHUNK):
+            *complete, pending = (pending + chunk).split(SEPARATOR)
+            yield from complete
+
+
+def record_fragment(digest, fragments):
+    """Pass fragments through while storing them; kept only if fully consumed."""
+    path = fragment_path(digest)
+    os.makedirs(FRAGMENT_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for fragment in fragments:
+            f.write(fragment + SEPARATOR)
+            yield fragment
+    os.replace(tmp, path)
+
+
+def stale_keys(name, digests, specs, sidecar_dir):
+    """Keys whose digest differs from the last build, whose fragment is gone
+    or whose sidecar holds other data."""
+    built = read_manifest(name).get("tables", {})
+    try:
+        with open(os.path.join(sidecar_dir, "index.json"), encoding="utf-8") as f:
+            exported = {entry["key"]: entry.get("digest") for entry in json.load(f)["tables"]}
+    except FileNotFoundError:
+        exported = {}
+    specs = {spec["key"]: spec for spec in specs}
+    return [key for key, digest in digests.items()
+            if built.get(key) != digest or exported.get(key) != data_digest(specs[key])
+            or not os.path.exists(fragment_path(digest))]
+
+
+def read_manifest(name):
+    try:
+        with open(os.path.join(MANIFEST_DIR, f"{name}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_manifest(name, digests):
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    with open(os.path.join(MANIFEST_DIR, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump({"tables": digests}, f, indent=1)
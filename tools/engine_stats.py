@@ -0,0 +1,124 @@
+"""
+Call counters and timers for the property engine.
+
+Every evaluate() / saturation_rows() call is counted per backend, fluid
+and input pair: engine calls, cells requested per output, cells skipped
+by the domain check, failures and time. States that actually reach
+CoolProp (cache misses) are counted with the time spent flashing them,
+and property_cache reports hits and misses per cached function.
+
+write_report() saves the totals with the CoolProp version as JSON, by
+default to .cache/reports/<script>-CoolProp-<version>.json, so runs can
+be compared across CoolProp versions. Callers can add their own sections
+(the generators add the artifact sizes).
+"""
+
+import json
+import os
+import platform
+import time
+
+import CoolProp
+
+REPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "reports")
+
+_started = time.perf_counter()
+_pairs = {}
+_cache = {}
+
+
+def _entry(key):
+    return _pairs.setdefault(key, {
+        "calls": 0, "cells": 0, "skipped": 0, "failures": 0, "seconds": 0.0,
+        "flashed": 0, "eos_seconds": 0.0, "outputs": {},
+    })
+
+
+def record_call(backend, fluid, names, outputs, cells, skipped, failures, seconds):
+    """Count one engine call over `cells` input cells."""
+    entry = _entry((backend, fluid, ",".join(names)))
+    entry["calls"] += 1
+    entry["cells"] += int(cells)
+    entry["skipped"] += int(skipped)
+    entry["failures"] += int(failures)
+    entry["seconds"] += seconds
+    for name in outputs:
+        entry["outputs"][name] = entry["outputs"].get(name, 0) + int(cells)
+
+
+def record_flash(backend, fluid, names, states, seconds):
+    """Count `states` CoolProp updates (a cache miss)."""
+    entry = _entry((backend, fluid, ",".join(names)))
+    entry["flashed"] += int(states)
+    entry["eos_seconds"] += seconds
+
+
+def record_cache(name, hit):
+    """Count a property_cache lookup."""
+    counts = _cache.setdefault(name, {"hits": 0, "misses": 0})
+    counts["hits" if hit else "misses"] += 1
+
+
+def take():
+    """Return the counters collected so far and reset them."""
+    stats = {"pairs": [[list(key), value] for key, value in _pairs.items()],
+             "cache": dict(_cache)}
+    _pairs.clear()
+    _cache.clear()
+    return stats
+
+
+def merge(stats):
+    """Add counters taken from another process."""
+    for key, value in stats["pairs"]:
+        entry = _entry(tuple(key))
+        for k, v in value.items():
+            if k == "outputs":
+                for name, n in v.items():
+                    entry[k][name] = entry[k].get(name, 0) + n
+            else:
+                entry[k] += v
+    for name, counts in stats["cache"].items():
+        own = _cache.setdefault(name, {"hits": 0, "misses": 0})
+        own["hits"] += counts["hits"]
+        own["misses"] += counts["misses"]
+
+
+def report(script, **sections):
+    """The collected counters (plus any extra `sections`) as a JSON-ready dict."""
+    hits = sum(c["hits"] for c in _cache.values())
+    lookups = hits + sum(c["misses"] for c in _cache.values())
+    return {
+        "script": script,
+        "coolprop": CoolProp.__version__,
+        "python": platform.python_version(),
+        "wall_seconds": time.perf_counter() - _started,
+        "cache": {"lookups": lookups, "hit_rate": hits / lookups if lookups else None,
+                  "functions": _cache},
+        "pairs": [dict(zip(("backend", "fluid", "inputs"), key), **value)
+                  for key, value in sorted(_pairs.items())],
+        **sections,
+    }
+
+
+def summary():
+    """One-line digest of the counters."""
+    entries = _pairs.values()
+    hits = sum(c["hits"] for c in _cache.values())
+    lookups = hits + sum(c["misses"] for c in _cache.values())
+    rate = f"{100 * hits / lookups:.0f}%" if lookups else "n/a"
+    return (f"Property engine: {sum(e['calls'] for e in entries)} call(s), "
+            f"{sum(e['cells'] for e in entries)} cell(s), "
+            f"{sum(e['flashed'] for e in entries)} flashed in {sum(e['eos_seconds'] for e in entries):.2f} s, "
+            f"{sum(e['skipped'] for e in entries)} skipped, "
+            f"{sum(e['failures'] for e in entries)} failure(s), cache hit rate {rate}")
+
+
+def write_report(script, path=None, **sections):
+    """Write report(script, **sections) as JSON and return the path."""
+    if path is None:
+        path = os.path.join(REPORT_DIR, f"{script}-CoolProp-{CoolProp.__version__}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report(script, **sections), f, indent=1)
+    return path
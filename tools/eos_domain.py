@@ -0,0 +1,137 @@
+"""
+Validity domain of the equations of state, checked before any flash.
+
+check() gives a reason code for every input cell outside the fluid's
+limits (T_min / melting line, T_max, p_max, triple and critical point for
+saturation states), so the property engine skips those cells instead of
+letting CoolProp raise and catching the exception. Skipped cells and
+cells that still fail inside the domain are kept in a structured log
+that the generators print a summary of and can write out as JSON.
+"""
+
+import json
+
+import CoolProp.CoolProp as CP
+import numpy as np
+
+# Relative slack on the limits: table end points such as 0.01 °C + 273.15
+# land a rounding error below the triple point. The critical point itself
+# is a valid saturation state, but CoolProp rejects anything above it, so
+# that limit is inclusive and exact.
+RTOL = 1e-9
+
+SKIPPED = "skipped"
+FAILED = "failed"
+
+_limits = {}
+_records = {}
+
+
+def limits(fluid):
+    """Dict of T_min, T_max, T_triple, p_triple, T_crit, p_crit, p_max (SI)."""
+    if fluid not in _limits:
+        state = CP.AbstractState("HEOS", fluid)
+        _limits[fluid] = {
+            "T_min": state.Tmin(),
+            "T_max": state.Tmax(),
+            "T_triple": state.trivial_keyed_output(CP.iT_triple),
+            "p_triple": state.trivial_keyed_output(CP.iP_triple),
+            "T_crit": state.T_critical(),
+            "p_crit": state.p_critical(),
+            "p_max": state.pmax(),
+            "state": state,
+        }
+    return _limits[fluid]
+
+
+def melting_temperature(fluid, p):
+    """Lowest valid single-phase temperature [K] for each pressure [Pa].
+
+    The melting line where CoolProp has one, T_min elsewhere.
+    """
+    lim = limits(fluid)
+    state = lim["state"]
+    p = np.asarray(p, dtype=float)
+    if not state.has_melting_line():
+        return np.full(p.shape, lim["T_min"])
+    # A grid repeats each pressure along a column: evaluate the line once per value
+    unique, inverse = np.unique(p, return_inverse=True)
+    t_melt = np.full(unique.shape, lim["T_min"])
+    for i, val in enumerate(unique):
+        # The melting line is only defined over its own pressure range
+        try:
+            t_melt[i] = state.melting_line(CP.iT, CP.iP, val)
+        except ValueError:
+            continue
+    return t_melt[inverse.reshape(p.shape)]
+
+
+def check(fluid, names, a, b):
+    """Reason code per cell ('' = inside the domain) for an input pair.
+
+    `names` and `a`, `b` are as in property_engine: the sorted input names
+    ('H', 'P', 'Q', 'S', 'T') and broadcast arrays of their values.
+    """
+    lim = limits(fluid)
+    given = dict(zip(names, (a, b)))
+    lo, hi = 1 - RTOL, 1 + RTOL
+
+    conditions = []
+    if "Q" in given:
+        q = given["Q"]
+        conditions.append((~((q >= 0) & (q <= 1)), "quality outside [0, 1]"))
+        if "P" in given:
+            p = given["P"]
+            conditions.append((~(p >= lim["p_triple"] * lo), "below triple point"))
+            conditions.append((~(p <= lim["p_crit"]), "above critical point"))
+        else:
+            t = given["T"]
+            conditions.append((~(t >= lim["T_triple"] * lo), "below triple point"))
+            conditions.append((~(t <= lim["T_crit"]), "above critical point"))
+    else:
+        p = given["P"]
+        conditions.append((~(p > 0), "non-positive pressure"))
+        conditions.append((~(p <= lim["p_max"] * hi), "above p_max"))
+        if "T" in given:
+            t = given["T"]
+            conditions.append((~(t >= melting_temperature(fluid, p) * lo), "below melting line / T_min"))
+            conditions.append((~(t <= lim["T_max"] * hi), "above T_max"))
+
+    masks, reasons = zip(*conditions)
+    return np.select(masks, reasons, default="")
+
+
+def record(kind, backend, fluid, names, a, b, mask, reasons=None):
+    """Log the cells under `mask` as SKIPPED (with reasons) or FAILED."""
+    for i in zip(*np.nonzero(mask)):
+        inputs = {names[0]: float(a[i]), names[1]: float(b[i])}
+        reason = str(reasons[i]) if reasons is not None else "no state from the EOS"
+        key = (kind, backend, fluid) + tuple(inputs.items())
+        _records[key] = {"kind": kind, "backend": backend, "fluid": fluid,
+                         "inputs": inputs, "reason": reason}
+
+
+def take_records():
+    """Return the logged records and clear the log."""
+    records = list(_records.values())
+    _records.clear()
+    return records
+
+
+def merge(records):
+    """Add records taken from another process."""
+    for rec in records:
+        key = (rec["kind"], rec["backend"], rec["fluid"]) + tuple(rec["inputs"].items())
+        _records[key] = rec
+
+
+def summary():
+    """One-line count of skipped and failed cells."""
+    kinds = [rec["kind"] for rec in _records.values()]
+    return f"EOS domain: {kinds.count(SKIPPED)} cell(s) skipped, {kinds.count(FAILED)} failed"
+
+
+def write_log(path):
+    """Write the log as a JSON list of records."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(list(_records.values()), f, indent=1, ensure_ascii=False)
@@ -0,0 +1,119 @@
+"""
+Registry of the published tables: fluids, table kinds, ranges and themes.
+
+FLUIDS holds the per-fluid names and default theme; TABLES is the list of
+table specs in document order, each with its key, kind ('sat_p', 'sat_t',
+'superheated' or 'compressed' liquid), CoolProp fluid name and the printed
+inputs, p [bar] and/or t [°C]. Titles come from the kind unless an entry
+sets "title" (standalone page) or "moodle_title"; "theme" overrides the
+fluid's. Theme names map to the colour sets of both generators.
+
+Adding a table is one entry here: table_data evaluates it with the rest,
+both generators render it and it gets its sidecars and manifest digest.
+New entries go at the end, since the position is the published
+"Tablica N" number that course material refers to.
+"""
+
+import numpy as np
+
+# Display names: standalone page, Moodle page, short name for Moodle titles
+FLUIDS = {
+    "Water": {"name": "Woda (H₂O)", "moodle_name": "Woda", "short": "Woda", "theme": "blue"},
+    "R134a": {"name": "R134a", "moodle_name": "R134a", "short": "R134a", "theme": "cyan"},
+    "R290": {"name": "R290 (Propan)", "moodle_name": "Propan", "short": "R290", "theme": "orange"},
+    "Ammonia": {"name": "Amoniak (R717, NH₃)", "moodle_name": "Amoniak", "short": "R717", "theme": "purple"},
+    "CO2": {"name": "Dwutlenek węgla (R744, CO₂)", "moodle_name": "CO2", "short": "R744", "theme": "slate"},
+    "R32": {"name": "R32 (Difluorometan)", "moodle_name": "R32", "short": "R32", "theme": "teal"},
+    "R1234yf": {"name": "R1234yf", "moodle_name": "R1234yf", "short": "R1234yf", "theme": "magenta"},
+}
+
+KIND_TITLES = {"sat_p": "nasycony (wg ciśnienia)", "sat_t": "nasycony (wg temperatury)",
+               "superheated": "przegrzany", "compressed": "(ciecz sprężona)"}
+MOODLE_KIND_TITLES = {"sat_p": "Sat", "sat_t": "Sat", "superheated": "Przegrzany",
+                      "compressed": "Ciecz sprężona"}
+
+# Water saturation pressures: MPa steps -> bar
+_p_water_mpa = [*np.arange(0.001, 0.01, 0.001), *np.arange(0.01, 0.1, 0.01),
+                *np.arange(0.1, 1.0, 0.1), *np.arange(1.0, 22.1, 0.5)]
+_p_refrigerant = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0,
+                  12, 14, 16, 18, 20, 25, 30, 35, 40]
+
+TABLES = [
+    {"key": "water_sat_p", "kind": "sat_p", "fluid": "Water",
+     "p": [x * 10 for x in _p_water_mpa],
+     "title": "Woda nasycona (wg ciśnienia)", "moodle_title": "Woda nasycona"},
+    {"key": "water_sat_t", "kind": "sat_t", "fluid": "Water",
+     "t": np.arange(0.01, 374, 1.0), "theme": "green",
+     "title": "Woda nasycona (wg temperatury)", "moodle_title": "Woda nasycona"},
+    {"key": "water_superheated", "kind": "superheated", "fluid": "Water",
+     "p": [0.1, 0.5, 1, 2, 5, 8, 10, 12, 15, 17, 20, 30, 40, 50, 70, 100, 120, 150, 200, 250],
+     "t": np.arange(0, 801, 10.0), "theme": "red",
+     "title": "Para wodna przegrzana", "moodle_title": "Para przegrzana"},
+    {"key": "r134a_sat_t", "kind": "sat_t", "fluid": "R134a",
+     "t": np.arange(-50, 101, 1.0)},
+    {"key": "r134a_sat_p", "kind": "sat_p", "fluid": "R134a",
+     "p": _p_refrigerant},
+    {"key": "r290_sat_t", "kind": "sat_t", "fluid": "R290",
+     "t": np.arange(-50, 96, 1.0)},
+    {"key": "r290_sat_p", "kind": "sat_p", "fluid": "R290",
+     "p": _p_refrigerant},
+    {"key": "r290_superheated", "kind": "superheated", "fluid": "R290",
+     "p": [1.0, 5.0, 15.0],
+     "t": np.arange(-50, 150, 10.0)},
+    {"key": "nh3_sat_t", "kind": "sat_t", "fluid": "Ammonia",
+     "t": np.arange(-60, 133, 1.0)},
+    {"key": "nh3_sat_p", "kind": "sat_p", "fluid": "Ammonia",
+     "p": [0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 12, 14, 16, 18, 20, 25, 30, 35, 40,
+           50, 60, 70, 80, 90, 100, 110]},
+    {"key": "nh3_superheated", "kind": "superheated", "fluid": "Ammonia",
+     "p": [1.0, 2.0, 5.0, 10, 15, 20, 30],
+     "t": np.arange(-30, 201, 10.0)},
+    {"key": "r744_sat_t", "kind": "sat_t", "fluid": "CO2",
+     "t": np.arange(-56, 31, 1.0)},
+    {"key": "r744_sat_p", "kind": "sat_p", "fluid": "CO2",
+     "p": [5.5, 6.0, 7.0, 8.0, 10, 12, 14, 16, 18, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 72]},
+    # Above 73.8 bar the columns are supercritical (transcritical cycles)
+    {"key": "r744_superheated", "kind": "superheated", "fluid": "CO2",
+     "p": [10, 20, 30, 40, 50, 60, 80, 100, 120],
+     "t": np.arange(-50, 161, 10.0)},
+    {"key": "r32_sat_t", "kind": "sat_t", "fluid": "R32",
+     "t": np.arange(-60, 79, 1.0)},
+    {"key": "r32_sat_p", "kind": "sat_p", "fluid": "R32",
+     "p": _p_refrigerant + [45, 50, 55]},
+    {"key": "r32_superheated", "kind": "superheated", "fluid": "R32",
+     "p": [1.0, 5.0, 10, 20, 30, 40],
+     "t": np.arange(-40, 161, 10.0)},
+    {"key": "r1234yf_sat_t", "kind": "sat_t", "fluid": "R1234yf",
+     "t": np.arange(-50, 95, 1.0)},
+    {"key": "r1234yf_sat_p", "kind": "sat_p", "fluid": "R1234yf",
+     "p": [p for p in _p_refrigerant if p <= 30]},
+    {"key": "r1234yf_superheated", "kind": "superheated", "fluid": "R1234yf",
+     "p": [1.0, 5.0, 10, 15, 20, 25],
+     "t": np.arange(-30, 131, 10.0)},
+    {"key": "water_compressed", "kind": "compressed", "fluid": "Water",
+     "p": [50, 100, 150, 200, 250, 300, 400, 500],
+     "t": np.arange(0, 381, 20.0),
+     "title": "Woda ciekła sprężona", "moodle_title": "Woda sprężona"},
+    # Evaporation / condensation pressures of the Cw06 refrigeration cycles
+    {"key": "r134a_superheated", "kind": "superheated", "fluid": "R134a",
+     "p": [1.0, 1.4, 2.0, 2.4, 3.0, 4.0, 5.0, 6.0, 8.0, 10, 12, 14, 16],
+     "t": np.arange(-20, 161, 10.0)},
+]
+
+
+def document(style="html"):
+    """(spec, title, fluid display name, theme) per table, numbered in order.
+
+    `style` is 'html' for the standalone page or 'moodle'.
+    """
+    entries = []
+    for n, spec in enumerate(TABLES, 1):
+        fluid = FLUIDS[spec["fluid"]]
+        if style == "moodle":
+            name = fluid["moodle_name"]
+            title = spec.get("moodle_title") or f"{fluid['short']} {MOODLE_KIND_TITLES[spec['kind']]}"
+        else:
+            name = fluid["name"]
+            title = spec.get("title") or f"{name} {KIND_TITLES[spec['kind']]}"
+        entries.append((spec, f"Tablica {n}. {title}", name, spec.get("theme", fluid["theme"])))
+    return entries
@@ -1,9 +1,22 @@
+import argparse
+import os
+import re
+
 import CoolProp
-import CoolProp.CoolProp as CP
 import numpy as np
 
+import engine_stats
+import eos_domain
+from build_manifest import read_fragment, record_fragment, stale_keys, table_digest, write_manifest
+from fluid_registry import TABLES, document
+from precompress import compress, summary as precompress_summary
+from table_data import build_tables, refined_specs
+from table_export import SIDECAR_DIR, write_sidecars
+
 # Configuration
 OUTPUT_FILE = "/Users/marekurbaniak/Documents/R/Termodynamika_quatro/Cwiczenia/xml/tablice_termodynamiczne_moodle.html"
+# Bump when the table markup changes; part of every table's build_manifest digest
+RENDERER_VERSION = 1
 
 # Common Inline Styles
 STYLE_TABLE = "width: 100%; border-collapse: collapse; font-family: 'Segoe UI', Arial, sans-serif; font-size: 13px; margin: 0 auto;"
@@ -15,13 +28,22 @@ STYLE_DETAILS = "margin-bottom: 20px; border: 1px solid #ccc; border-radius: 5px
 STYLE_SUMMARY = "cursor: pointer; padding: 10px; background-color: #eee; font-weight: bold; list-style: none;"
 STYLE_WRAPPER = "overflow-x: auto; max-height: 700px; overflow-y: auto; position: relative;"
 
+# Compact mode: inline styles become classes scoped under this wrapper class
+COMPACT_SCOPE = "ttm"
+STYLE_ATTR = re.compile(r'style="([^"]*)"')
+TAG_GAP = re.compile(r">\s+<")
+
 # Theme Colors (Background for headers, striped rows)
 THEMES = {
     "blue":   {"head": "#2980b9", "stripe": "#eaf2f8", "th_bg": "#d4e6f1"},
     "green":  {"head": "#27ae60", "stripe": "#e9f7ef", "th_bg": "#d5f5e3"},
     "cyan":   {"head": "#17a2b8", "stripe": "#e0f7fa", "th_bg": "#b2ebf2"},
     "orange": {"head": "#e67e22", "stripe": "#fcece0", "th_bg": "#fad7a0"},
-    "red":    {"head": "#c0392b", "stripe": "#fadbd8", "th_bg": "#f9e79f"}
+    "red":    {"head": "#c0392b", "stripe": "#fadbd8", "th_bg": "#f9e79f"},
+    "purple": {"head": "#8e44ad", "stripe": "#f4ecf7", "th_bg": "#e8daef"},
+    "slate":  {"head": "#34495e", "stripe": "#ebedef", "th_bg": "#d6dbdf"},
+    "teal":   {"head": "#16a085", "stripe": "#e8f8f5", "th_bg": "#d0ece7"},
+    "magenta": {"head": "#c2185b", "stripe": "#fce4ec", "th_bg": "#f8bbd0"}
 }
 
 def fmt(val, precision=4):
@@ -34,15 +56,6 @@ def fmt(val, precision=4):
     if ',' in s: s = s.rstrip('0').rstrip(',')
     return s
 
-def get_prop(fluid, prop, p=None, t=None, q=None):
-    try:
-        args = []
-        if p is not None: args.extend(['P', p])
-        if t is not None: args.extend(['T', t + 273.15])
-        if q is not None: args.extend(['Q', q])
-        return CP.PropsSI(prop, *args, fluid)
-    except: return None
-
 def get_row_style(idx, theme_key):
     # Group by 5: 0-4 white, 5-9 colored
     bg = "#ffffff"
@@ -50,12 +63,12 @@ def get_row_style(idx, theme_key):
         bg = THEMES[theme_key]["stripe"]
     return f"background-color: {bg};"
 
-def generate_sat_p_table(fluid, title, fluid_name_display, p_range, theme_key="blue"):
+def generate_sat_p_table(table, title, fluid_name_display, theme_key="blue"):
     theme = THEMES[theme_key]
     th_style = f"{STYLE_TH} background-color: {theme['th_bg']}; border-color: {theme['head']};"
     sticky_th = f"{th_style} {STYLE_STICKY_COL_TH} background-color: {theme['th_bg']};"
     
-    html = f"""
+    yield f"""
     <details style="{STYLE_DETAILS}">
         <summary style="{STYLE_SUMMARY} background-color: {theme['head']}; color: white;">
             <span style="font-size: 1.1em;">{title} ({fluid_name_display})</span>
@@ -79,21 +92,17 @@ def generate_sat_p_table(fluid, title, fluid_name_display, p_range, theme_key="b
                 <tbody>
     """
     
-    for i, p_bar in enumerate(p_range):
+    sat = table.sat
+    cols = np.vstack([sat['T'] - 273.15, sat['v_liq'] * 1000, sat['v_vap'], sat['rho_vap'],
+                      sat['h_liq'] / 1000, sat['h_vap'] / 1000, sat['r'] / 1000,
+                      sat['s_liq'] / 1000, sat['s_vap'] / 1000])
+    
+    for i, (p_bar, row) in enumerate(zip(table.p, cols.T)):
         row_bg = get_row_style(i, theme_key)
-        p_pa = p_bar * 1e5
-        try:
-            ts = get_prop(fluid, 'T', p=p_pa, q=0) - 273.15
-            vl = get_prop(fluid, 'D', p=p_pa, q=0)**-1 * 1000
-            vv = get_prop(fluid, 'D', p=p_pa, q=1)**-1
-            rho = get_prop(fluid, 'D', p=p_pa, q=1)
-            hl = get_prop(fluid, 'H', p=p_pa, q=0) / 1000
-            hv = get_prop(fluid, 'H', p=p_pa, q=1) / 1000
-            r = hv - hl
-            sl = get_prop(fluid, 'S', p=p_pa, q=0) / 1000
-            sv = get_prop(fluid, 'S', p=p_pa, q=1) / 1000
+        if not np.isnan(row).any():
+            ts, vl, vv, rho, hl, hv, r, sl, sv = row
             
-            html += f"""<tr style="{row_bg}">
+            yield f"""<tr style="{row_bg}">
                 <td style="{STYLE_TD} {STYLE_STICKY_COL_TD} {row_bg}">{fmt(p_bar, 3)}</td>
                 <td style="{STYLE_TD}">{fmt(ts, 2)}</td>
                 <td style="{STYLE_TD} background-color: rgba(255,255,0,0.05);">{fmt(vl, 4)}</td>
@@ -105,17 +114,15 @@ def generate_sat_p_table(fluid, title, fluid_name_display, p_range, theme_key="b
                 <td style="{STYLE_TD}">{fmt(sl, 4)}</td>
                 <td style="{STYLE_TD}">{fmt(sv, 4)}</td>
             </tr>"""
-        except: continue
 
-    html += "</tbody></table></div></details>"
-    return html
+    yield "</tbody></table></div></details>"
 
-def generate_sat_t_table(fluid, title, fluid_name_display, t_range, theme_key="green"):
+def generate_sat_t_table(table, title, fluid_name_display, theme_key="green"):
     theme = THEMES[theme_key]
     th_style = f"{STYLE_TH} background-color: {theme['th_bg']}; border-color: {theme['head']};"
     sticky_th = f"{th_style} {STYLE_STICKY_COL_TH} background-color: {theme['th_bg']};"
     
-    html = f"""
+    yield f"""
     <details style="{STYLE_DETAILS}">
         <summary style="{STYLE_SUMMARY} background-color: {theme['head']}; color: white;">
             <span style="font-size: 1.1em;">{title} ({fluid_name_display})</span>
@@ -139,21 +146,18 @@ def generate_sat_t_table(fluid, title, fluid_name_display, t_range, theme_key="g
                 <tbody>
     """
     
-    for i, t_c in enumerate(t_range):
+    sat = table.sat
+    # For header display, standard is kPa, but let's conform
+    cols = np.vstack([sat['p'] / 1000, sat['v_liq'] * 1000, sat['v_vap'], sat['rho_vap'],
+                      sat['h_liq'] / 1000, sat['h_vap'] / 1000, sat['r'] / 1000,
+                      sat['s_liq'] / 1000, sat['s_vap'] / 1000])
+    
+    for i, (t_c, row) in enumerate(zip(table.t, cols.T)):
         row_bg = get_row_style(i, theme_key)
-        try:
-            p_sat = get_prop(fluid, 'P', t=t_c, q=0) / 1000 # kPa
-            # For header display, standard is kPa, but let's conform
-            vl = get_prop(fluid, 'D', t=t_c, q=0)**-1 * 1000
-            vv = get_prop(fluid, 'D', t=t_c, q=1)**-1
-            rho = get_prop(fluid, 'D', t=t_c, q=1)
-            hl = get_prop(fluid, 'H', t=t_c, q=0) / 1000
-            hv = get_prop(fluid, 'H', t=t_c, q=1) / 1000
-            r = hv - hl
-            sl = get_prop(fluid, 'S', t=t_c, q=0) / 1000
-            sv = get_prop(fluid, 'S', t=t_c, q=1) / 1000
+        if not np.isnan(row).any():
+            p_sat, vl, vv, rho, hl, hv, r, sl, sv = row
             
-            html += f"""<tr style="{row_bg}">
+            yield f"""<tr style="{row_bg}">
                 <td style="{STYLE_TD} {STYLE_STICKY_COL_TD} {row_bg}">{fmt(t_c, 1)}</td>
                 <td style="{STYLE_TD}">{fmt(p_sat, 3)}</td>
                 <td style="{STYLE_TD} background-color: rgba(255,255,0,0.05);">{fmt(vl, 4)}</td>
@@ -165,26 +169,34 @@ def generate_sat_t_table(fluid, title, fluid_name_display, t_range, theme_key="g
                 <td style="{STYLE_TD}">{fmt(sl, 4)}</td>
                 <td style="{STYLE_TD}">{fmt(sv, 4)}</td>
             </tr>"""
-        except: continue
         
-    html += "</tbody></table></div></details>"
-    return html
+    yield "</tbody></table></div></details>"
+
+# Grid kinds: saturation row fields (v, h, s), v scale and v header; the
+# compressed liquid prints v in dm³/kg like v' of the saturation tables
+GRID_KINDS = {
+    "superheated": (("v_vap", "h_vap", "s_vap"), 1, "v"),
+    "compressed": (("v_liq", "h_liq", "s_liq"), 1e3, "v [dm³/kg]"),
+}
 
-def generate_superheated_table(fluid, title, fluid_name_display, p_range, t_range, theme_key="red"):
+def generate_superheated_table(table, title, fluid_name_display, theme_key="red"):
+    # Also renders the compressed-liquid tables (other phase masked by table.excluded)
     theme = THEMES[theme_key]
     th_style = f"{STYLE_TH} background-color: {theme['th_bg']}; border-color: {theme['head']};"
     sticky_th = f"{th_style} {STYLE_STICKY_COL_TH} background-color: {theme['th_bg']}; z-index: 30;"
     
+    sat, excluded, grid, failed = table.sat, table.excluded, table.grid, table.failed
+    sat_fields, v_scale, v_label = GRID_KINDS[table.kind]
+    
     # Headers
     header_cols = ""
     sub_header = ""
-    for p_bar in p_range:
-        ts_val = get_prop(fluid, 'T', p=p_bar*1e5, q=1)
-        ts_str = f"t_s={fmt(ts_val-273.15, 1)}" if ts_val else "Nadkryt."
+    for p_bar, ts_val in zip(table.p, sat['T']):
+        ts_str = f"t_s={fmt(ts_val-273.15, 1)}" if not np.isnan(ts_val) else "Nadkryt."
         header_cols += f'<th colspan="3" style="{th_style} border-bottom: 2px solid #555;">p={fmt(p_bar, 3)} bar<br><small>{ts_str}</small></th>'
-        sub_header += f'<th style="{th_style} background-color:rgba(255,255,0,0.1);">v</th><th style="{th_style} background-color:rgba(0,255,255,0.1);">h</th><th style="{th_style}">s</th>'
+        sub_header += f'<th style="{th_style} background-color:rgba(255,255,0,0.1);">{v_label}</th><th style="{th_style} background-color:rgba(0,255,255,0.1);">h</th><th style="{th_style}">s</th>'
 
-    html = f"""
+    yield f"""
     <details style="{STYLE_DETAILS}">
         <summary style="{STYLE_SUMMARY} background-color: {theme['head']}; color: white;">
             <span style="font-size: 1.1em;">{title} ({fluid_name_display})</span>
@@ -202,75 +214,192 @@ def generate_superheated_table(fluid, title, fluid_name_display, p_range, t_rang
     """
     
     # Saturation Line
-    html += f'<tr style="font-weight:bold; background-color: #fff5e6; border-bottom: 2px solid #aaa;"><td style="{STYLE_TD} {STYLE_STICKY_COL_TD} background-color: #fff5e6;">Stan nas.</td>'
-    for p_bar in p_range:
-        try:
-            p_pa = p_bar*1e5
-            if get_prop(fluid, 'T', p=p_pa, q=1) is None:
-                html += f'<td colspan="3" style="{STYLE_TD}">(Nadkryt.)</td>'
-            else:
-                vv = get_prop(fluid, 'D', p=p_pa, q=1)**-1
-                hv = get_prop(fluid, 'H', p=p_pa, q=1)/1000
-                sv = get_prop(fluid, 'S', p=p_pa, q=1)/1000
-                html += f'<td style="{STYLE_TD} background-color:rgba(255,255,0,0.05);">{fmt(vv,4)}</td><td style="{STYLE_TD} background-color:rgba(0,255,255,0.05);">{fmt(hv,1)}</td><td style="{STYLE_TD}">{fmt(sv,4)}</td>'
-        except: html += f'<td colspan="3" style="{STYLE_TD}">-</td>'
-    html += '</tr>'
+    line = f'<tr style="font-weight:bold; background-color: #fff5e6; border-bottom: 2px solid #aaa;"><td style="{STYLE_TD} {STYLE_STICKY_COL_TD} background-color: #fff5e6;">Stan nas.</td>'
+    for row in sat:
+        if np.isnan(row['T']):
+            line += f'<td colspan="3" style="{STYLE_TD}">(Nadkryt.)</td>'
+        else:
+            vv = row[sat_fields[0]]*v_scale
+            hv = row[sat_fields[1]]/1000
+            sv = row[sat_fields[2]]/1000
+            line += f'<td style="{STYLE_TD} background-color:rgba(255,255,0,0.05);">{fmt(vv,4)}</td><td style="{STYLE_TD} background-color:rgba(0,255,255,0.05);">{fmt(hv,1)}</td><td style="{STYLE_TD}">{fmt(sv,4)}</td>'
+    yield line + '</tr>'
     
     # Temp Rows
-    for i, t_c in enumerate(t_range):
+    for i, t_c in enumerate(table.t):
         row_bg = get_row_style(i, theme_key)
-        html += f'<tr style="{row_bg}"><td style="{STYLE_TD} {STYLE_STICKY_COL_TD} {row_bg}">{fmt(t_c, 0)}</td>'
+        line = f'<tr style="{row_bg}"><td style="{STYLE_TD} {STYLE_STICKY_COL_TD} {row_bg}">{fmt(t_c, 0)}</td>'
         
-        for p_bar in p_range:
-            p_pa = p_bar * 1e5
-            ts_val = get_prop(fluid, 'T', p=p_pa, q=1)
-            ts = ts_val - 273.15 if ts_val else None
-            
-            if ts is not None and t_c < ts:
-                html += f'<td colspan="3" style="{STYLE_TD} color:#ccc;">—</td>'
+        for j in range(len(table.p)):
+            if excluded[i, j]:
+                line += f'<td colspan="3" style="{STYLE_TD} color:#ccc;">—</td>'
+            elif failed[i, j]:
+                line += f'<td colspan="3" style="{STYLE_TD}">?</td>'
             else:
-                try:
-                    v = get_prop(fluid, 'D', t=t_c, p=p_pa)**-1
-                    h = get_prop(fluid, 'H', t=t_c, p=p_pa)/1000
-                    s = get_prop(fluid, 'S', t=t_c, p=p_pa)/1000
-                    html += f'<td style="{STYLE_TD} background-color:rgba(255,255,0,0.05);">{fmt(v,4)}</td><td style="{STYLE_TD} background-color:rgba(0,255,255,0.05);">{fmt(h,1)}</td><td style="{STYLE_TD}">{fmt(s,4)}</td>'
-                except: html += f'<td colspan="3" style="{STYLE_TD}">?</td>'
-        html += '</tr>'
+                v = grid['v'][i, j]*v_scale
+                h = grid['h'][i, j]/1000
+                s = grid['s'][i, j]/1000
+                line += f'<td style="{STYLE_TD} background-color:rgba(255,255,0,0.05);">{fmt(v,4)}</td><td style="{STYLE_TD} background-color:rgba(0,255,255,0.05);">{fmt(h,1)}</td><td style="{STYLE_TD}">{fmt(s,4)}</td>'
+        yield line + '</tr>'
         
-    html += "</tbody></table></div></details>"
-    return html
+    yield "</tbody></table></div></details>"
+
+# Renderer per table kind
+RENDERERS = {"sat_p": generate_sat_p_table, "sat_t": generate_sat_t_table,
+             "superheated": generate_superheated_table, "compressed": generate_superheated_table}
 
-def main():
-    content = ""
-    # Water Sat P
-    p_bars = [x*10 for x in [*np.arange(0.001,0.01,0.001), *np.arange(0.01,0.1,0.01), *np.arange(0.1,1.0,0.1), *np.arange(1.0,22.1,0.5)]]
-    content += generate_sat_p_table("Water", "Tablica 1. Woda nasycona", "Woda", p_bars, "blue")
+# Document order from the fluid registry: (table key, renderer, title, fluid display name, theme)
+LAYOUT = [(spec["key"], RENDERERS[spec["kind"]], title, display, theme)
+          for spec, title, display, theme in document("moodle")]
+
+def table_digests(specs=TABLES):
+    """build_manifest digest of every table in LAYOUT."""
+    specs = {spec["key"]: spec for spec in specs}
+    return {key: table_digest(specs[key], "generate_moodle_tables", RENDERER_VERSION,
+                              render.__name__, title, display, theme)
+            for key, render, title, display, theme in LAYOUT}
+
+def render_document(tables, digests=None, layout=LAYOUT):
+    """Yield the document of the `layout` tables; with `digests`, tables
+    missing from `tables` are spliced from their stored fragments and the
+    rendered ones are stored."""
+    yield """<!-- Moodle Output -->
+<div style="font-family: Arial, sans-serif; padding: 10px; background-color: #f9f9f9;">
+<h2 style="border-bottom: 2px solid #333; padding-bottom: 10px;">Tablice Termodynamiczne (Moodle-Safe)</h2>
+"""
+    for key, render, title, display, theme in layout:
+        if key not in tables:
+            yield from read_fragment(digests[key])
+        elif digests:
+            yield from record_fragment(digests[key], render(tables[key], title, display, theme))
+        else:
+            yield from render(tables[key], title, display, theme)
+
+    yield "\n</div>"
+
+def style_classes(fragments):
+    """Class name for each distinct inline style, in order of first use."""
+    classes = {}
+    for fragment in fragments:
+        for style in STYLE_ATTR.findall(fragment):
+            classes.setdefault(style, f"c{len(classes)}")
+    return classes
+
+def render_compact_document(tables, digests=None, layout=LAYOUT):
+    """The document with one scoped <style> block instead of inline styles.
+
+    The page renders the same, but every repeated style attribute becomes a
+    short class and whitespace between tags is dropped (~5x smaller).
+    """
+    # A first pass over the (cheap) renderer collects the distinct styles
+    classes = style_classes(render_document(tables, digests, layout))
+    rules = "".join(f".{COMPACT_SCOPE} .{name} {{{style}}}\n" for style, name in classes.items())
+    yield f'<style>\n{rules}</style>\n<div class="{COMPACT_SCOPE}">'
+    # The first pass stored every fragment, so the second one only splices
+    for fragment in render_document({} if digests else tables, digests, layout):
+        fragment = STYLE_ATTR.sub(lambda m: f'class="{classes[m.group(1)]}"', fragment)
+        yield TAG_GAP.sub("><", fragment.strip())
+    yield "</div>"
+
+def render_index(entries):
+    """Yield the split-mode index; `entries` are (file, title, display, theme_key, size)."""
+    yield """<!-- Moodle Output -->
+<div style="font-family: Arial, sans-serif; padding: 10px; background-color: #f9f9f9;">
+<h2 style="border-bottom: 2px solid #333; padding-bottom: 10px;">Tablice Termodynamiczne (Moodle-Safe)</h2>
+"""
+    for name, title, display, theme_key, size in entries:
+        yield f"""
+    <a href="{name}" style="{STYLE_SUMMARY} display: block; margin-bottom: 10px; border-radius: 5px; text-decoration: none; background-color: {THEMES[theme_key]['head']}; color: white;">
+        <span style="font-size: 1.1em;">{title} ({display})</span> <span style="font-weight: normal;">{size / 1024:.0f} kB</span>
+    </a>"""
+    yield "\n</div>"
+
+def write_split(directory, tables, digests=None, compact=False):
+    """Write every table as its own file plus index.html; returns the paths, index first."""
+    os.makedirs(directory, exist_ok=True)
+    entries, paths = [], []
+    for entry in LAYOUT:
+        key, _, title, display, theme_key = entry
+        path = os.path.join(directory, f"{key}.html")
+        with open(path, "w", encoding="utf-8", buffering=1 << 16) as f:
+            render = render_compact_document if compact else render_document
+            f.writelines(render(tables, digests, [entry]))
+        entries.append((f"{key}.html", title, display, theme_key, os.path.getsize(path)))
+        paths.append(path)
+    index = os.path.join(directory, "index.html")
+    with open(index, "w", encoding="utf-8") as f:
+        f.writelines(render_index(entries))
+    return [index] + paths
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the thermodynamic property tables.")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="evaluate table row chunks in this many processes (default: 1)")
+    parser.add_argument("--domain-log", metavar="PATH",
+                        help="write skipped out-of-domain cells and EOS failures as JSON")
+    parser.add_argument("--stats", metavar="PATH",
+                        help="property-call report path (default: .cache/reports/)")
+    parser.add_argument("--sidecar-dir", metavar="DIR",
+                        help="per-table .npz/.csv exports (default: Cwiczenia/xml/tablice_dane/)")
+    parser.add_argument("--compact", action="store_true",
+                        help="one scoped <style> block with classes instead of inline styles; "
+                             "needs a Moodle text format that keeps <style>")
+    parser.add_argument("--split", metavar="DIR",
+                        help="write each table as its own file plus an index.html linking them, "
+                             "so a page only pulls the table that is opened")
+    parser.add_argument("--adaptive", type=float, metavar="RTOL",
+                        help="choose the saturation-table rows from a fine grid so that linear "
+                             "interpolation between rows stays within this relative error (e.g. 0.005)")
+    parser.add_argument("--interp-report", metavar="DIR",
+                        help="write the interpolation-error report (JSON + heatmap PNG) of all tables")
+    parser.add_argument("--no-compress", action="store_true",
+                        help="skip the precompressed .gz/.br copies of the HTML")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="ignore the build manifest and recompute every table")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     
-    # Water Sat T
-    content += generate_sat_t_table("Water", "Tablica 2. Woda nasycona", "Woda", np.arange(0.01, 374, 1.0), "green")
+    sidecar_dir = args.sidecar_dir or SIDECAR_DIR
     
-    # Superheated
-    p_sup = [0.1, 0.5, 1, 2, 5, 8, 10, 12, 15, 17, 20, 30, 40, 50, 70, 100, 120, 150, 200, 250]
-    content += generate_superheated_table("Water", "Tablica 3. Para przegrzana", "Woda", p_sup, np.arange(0, 801, 10.0), "red")
+    # Saturation rows picked for an interpolation-error target instead of fixed steps
+    specs = refined_specs(TABLES, args.adaptive) if args.adaptive else TABLES
     
-    # R134a
-    content += generate_sat_t_table("R134a", "Tablica 4. R134a Sat", "R134a", np.arange(-50, 101, 1.0), "cyan")
-    content += generate_sat_p_table("R134a", "Tablica 5. R134a Sat", "R134a", [0.1,0.2,0.3,0.4,0.5,0.6,0.8,1,1.5,2,3,4,5,6,8,10,12,14,16,18,20,25,30,35,40], "cyan")
+    # Only tables whose digest changed since the last build are evaluated and rendered
+    digests = table_digests(specs)
+    stale = list(digests) if args.full_rebuild else stale_keys("generate_moodle_tables", digests, specs, sidecar_dir)
+    tables = build_tables([spec for spec in specs if spec["key"] in stale], jobs=args.jobs)
     
-    # R290
-    content += generate_sat_t_table("R290", "Tablica 6. R290 Sat", "Propan", np.arange(-50, 96, 1.0), "orange")
-    content += generate_sat_p_table("R290", "Tablica 7. R290 Sat", "Propan", [0.1,0.2,0.3,0.4,0.5,0.6,0.8,1,1.5,2,3,4,5,6,8,10,12,14,16,18,20,25,30,35,40], "orange")
-    content += generate_superheated_table("R290", "Tablica 8. R290 Przegrzany", "Propan", [1,5,15], np.arange(-50, 150, 10.0), "orange")
-
-    html = f"""<!-- Moodle Output -->
-<div style="font-family: Arial, sans-serif; padding: 10px; background-color: #f9f9f9;">
-<h2 style="border-bottom: 2px solid #333; padding-bottom: 10px;">Tablice Termodynamiczne (Moodle-Safe)</h2>
-{content}
-</div>"""
+    # Fragments go straight to the file through a 64 kB buffer
+    if args.split:
+        outputs = write_split(args.split, tables, digests, args.compact)
+    else:
+        outputs = [OUTPUT_FILE]
+        with open(OUTPUT_FILE, "w", encoding="utf-8", buffering=1 << 16) as f:
+            f.writelines(render_compact_document(tables, digests) if args.compact else render_document(tables, digests))
+    print(f"Generated {outputs[0]} ({len(stale)} of {len(LAYOUT)} table(s) rebuilt)")
     
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        f.write(html)
-    print(f"Generated {OUTPUT_FILE}")
+    # Same numbers, machine-readable
+    write_sidecars(tables, sidecar_dir, specs)
+    write_manifest("generate_moodle_tables", digests)
+    print(f"Sidecars: {sidecar_dir}")
+    if args.interp_report:
+        # Imported here: the report pulls in matplotlib, which plain builds do not need
+        from interpolation_report import report_sidecars
+
+        # Read back from the sidecars, which hold every table even after an incremental build
+        for line in report_sidecars(sidecar_dir, args.interp_report):
+            print(f"Interpolation error {line}")
+    print(eos_domain.summary())
+    if args.domain_log:
+        eos_domain.write_log(args.domain_log)
+    print(engine_stats.summary())
+    sizes = [] if args.no_compress else compress(outputs)
+    if sizes:
+        print(precompress_summary(sizes))
+    report = engine_stats.write_report("generate_moodle_tables", args.stats, artifacts=sizes)
+    print(f"Stats report: {report}")
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,24 @@
+import argparse
+import base64
+import json
+import os
+
 import CoolProp
-import CoolProp.CoolProp as CP
 import numpy as np
 
+import engine_stats
+import eos_domain
+from build_manifest import read_fragment, record_fragment, stale_keys, table_digest, write_manifest
+from fluid_registry import TABLES, document
+from precompress import compress, summary as precompress_summary
+from row_refinement import fmt_step
+from table_data import build_tables, refined_specs
+from table_export import SIDECAR_DIR, write_sidecars
+
 # Configuration
 OUTPUT_FILE = "/Users/marekurbaniak/Documents/R/Termodynamika_quatro/Cwiczenia/xml/tablice_termodynamiczne.html"
+# Bump when the table markup changes; part of every table's build_manifest digest
+RENDERER_VERSION = 1
 
 # CSS Styles
 CSS = """
@@ -69,6 +84,30 @@ CSS = """
     .theme-red th { background-color: #fdf2e9; border-bottom: 2px solid #d35400; }
     .theme-red th.sticky-col { background-color: #fdf2e9; }
     .theme-red tbody tr:nth-child(10n+6), .theme-red tbody tr:nth-child(10n+7), .theme-red tbody tr:nth-child(10n+8), .theme-red tbody tr:nth-child(10n+9), .theme-red tbody tr:nth-child(10n+10) { background-color: #fdf2e9; }
+
+    /* NH3 - Purple */
+    .theme-purple .header-bar { background-color: #8e44ad; border-color: #6c3483; }
+    .theme-purple th { background-color: #f4ecf7; border-bottom: 2px solid #8e44ad; }
+    .theme-purple th.sticky-col { background-color: #f4ecf7; }
+    .theme-purple tbody tr:nth-child(10n+6), .theme-purple tbody tr:nth-child(10n+7), .theme-purple tbody tr:nth-child(10n+8), .theme-purple tbody tr:nth-child(10n+9), .theme-purple tbody tr:nth-child(10n+10) { background-color: #f4ecf7; }
+
+    /* R744 - Slate */
+    .theme-slate .header-bar { background-color: #34495e; border-color: #1c2833; }
+    .theme-slate th { background-color: #ebedef; border-bottom: 2px solid #34495e; }
+    .theme-slate th.sticky-col { background-color: #ebedef; }
+    .theme-slate tbody tr:nth-child(10n+6), .theme-slate tbody tr:nth-child(10n+7), .theme-slate tbody tr:nth-child(10n+8), .theme-slate tbody tr:nth-child(10n+9), .theme-slate tbody tr:nth-child(10n+10) { background-color: #ebedef; }
+
+    /* R32 - Teal */
+    .theme-teal .header-bar { background-color: #16a085; border-color: #0e6655; }
+    .theme-teal th { background-color: #e8f8f5; border-bottom: 2px solid #16a085; }
+    .theme-teal th.sticky-col { background-color: #e8f8f5; }
+    .theme-teal tbody tr:nth-child(10n+6), .theme-teal tbody tr:nth-child(10n+7), .theme-teal tbody tr:nth-child(10n+8), .theme-teal tbody tr:nth-child(10n+9), .theme-teal tbody tr:nth-child(10n+10) { background-color: #e8f8f5; }
+
+    /* R1234yf - Magenta */
+    .theme-magenta .header-bar { background-color: #c2185b; border-color: #880e4f; }
+    .theme-magenta th { background-color: #fce4ec; border-bottom: 2px solid #c2185b; }
+    .theme-magenta th.sticky-col { background-color: #fce4ec; }
+    .theme-magenta tbody tr:nth-child(10n+6), .theme-magenta tbody tr:nth-child(10n+7), .theme-magenta tbody tr:nth-child(10n+8), .theme-magenta tbody tr:nth-child(10n+9), .theme-magenta tbody tr:nth-child(10n+10) { background-color: #fce4ec; }
     
     /* Utility */
     .unit { font-weight: normal; font-size: 11px; color: #555; display: block; }
@@ -103,6 +142,137 @@ document.addEventListener("DOMContentLoaded", function() {
 </script>
 """
 
+# Split mode index: the table headers become links to the per-table pages
+INDEX_CSS = """
+<style>
+    .table-link { display: block; text-decoration: none; }
+    .table-link .header-bar::after, .table-container.active.table-link .header-bar::after { content: '↗'; transform: none; }
+</style>
+"""
+
+# Packed mode: body rows are embedded as base64 Float32 and only the rows in
+# view are drawn, once a table is opened. Rows are striped by class because
+# nth-child no longer matches around the spacer rows.
+PACKED_CSS = """
+<style>
+    .table-container.packed tbody tr { background-color: #ffffff; }
+    .table-container.packed tbody tr.alt { background-color: #fcece0; }
+    .table-container.packed.theme-blue tbody tr.alt { background-color: #f1f8fc; }
+    .table-container.packed.theme-green tbody tr.alt { background-color: #eafaf1; }
+    .table-container.packed.theme-cyan tbody tr.alt { background-color: #e0f7fa; }
+    .table-container.packed.theme-orange tbody tr.alt { background-color: #fcece0; }
+    .table-container.packed.theme-red tbody tr.alt { background-color: #fdf2e9; }
+    .table-container.packed.theme-purple tbody tr.alt { background-color: #f4ecf7; }
+    .table-container.packed.theme-slate tbody tr.alt { background-color: #ebedef; }
+    .table-container.packed.theme-teal tbody tr.alt { background-color: #e8f8f5; }
+    .table-container.packed.theme-magenta tbody tr.alt { background-color: #fce4ec; }
+    .table-container.packed tbody tr.spacer td { padding: 0; border: 0; }
+</style>
+<script>
+(function() {
+    const OVERSCAN = 10;
+
+    // Same output as fmt() in generate_tables_coolprop.py
+    function fmt(v, precision) {
+        if (isNaN(v)) return "—";
+        const a = Math.abs(v);
+        const d = (a < 0.001 && v !== 0) ? 6 : (a < 0.1 && v !== 0) ? 5 : (a >= 1000) ? 0 : precision;
+        let s = v.toFixed(d).replace(".", ",");
+        if (s.indexOf(",") >= 0) s = s.replace(/0+$/, "").replace(/,$/, "");
+        return s;
+    }
+
+    function decode(b64, Type) {
+        const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+        return new Type(bytes.buffer);
+    }
+
+    function cell(t, row, c) {
+        const [precision, cls, bold] = t.cols[c];
+        const v = fmt(t.data[row * t.cols.length + c], precision);
+        return (cls ? `<td class="${cls}">` : "<td>") + (bold ? `<b>${v}</b>` : v) + "</td>";
+    }
+
+    function rowHtml(t, i) {
+        const alt = Math.floor((i + t.offset) / 5) % 2 === 1;
+        let html = alt ? '<tr class="alt">' : "<tr>";
+        html += cell(t, i, 0);
+        if (t.state) {
+            // Superheated: groups of v, h, s per pressure
+            const groups = (t.cols.length - 1) / 3;
+            for (let g = 0; g < groups; g++) {
+                const state = t.state[i * groups + g];
+                if (state === 1) html += '<td colspan="3" style="color:#ccc">—</td>';
+                else if (state === 2) html += '<td colspan="3">?</td>';
+                else html += cell(t, i, 1 + 3 * g) + cell(t, i, 2 + 3 * g) + cell(t, i, 3 + 3 * g);
+            }
+        } else {
+            for (let c = 1; c < t.cols.length; c++) html += cell(t, i, c);
+        }
+        return html + "</tr>";
+    }
+
+    function spacer(t, height) {
+        return `<tr class="spacer"><td colspan="${t.cols.length}" style="height:${height}px"></td></tr>`;
+    }
+
+    function draw(t) {
+        const top = t.wrapper.scrollTop - t.start;
+        const first = Math.min(t.rows, Math.max(0, Math.floor(top / t.rowHeight) - OVERSCAN));
+        const last = Math.max(first, Math.min(t.rows, Math.ceil((top + t.wrapper.clientHeight) / t.rowHeight) + OVERSCAN));
+        let html = t.fixed + spacer(t, first * t.rowHeight);
+        for (let i = first; i < last; i++) html += rowHtml(t, i);
+        t.tbody.innerHTML = html + spacer(t, (t.rows - last) * t.rowHeight);
+    }
+
+    function open(container) {
+        if (container._packed || !container.classList.contains("active")) return;
+        const t = JSON.parse(container.querySelector("script.packed-data").textContent);
+        t.data = decode(t.data, Float32Array);
+        if (t.state) t.state = decode(t.state, Uint8Array);
+        t.wrapper = container.querySelector(".table-wrapper");
+        t.tbody = container.querySelector("tbody");
+        t.fixed = t.tbody.innerHTML;
+
+        // Rows have a uniform height; measure one
+        t.tbody.innerHTML = t.fixed + rowHtml(t, 0);
+        t.rowHeight = t.tbody.lastElementChild.offsetHeight || 28;
+        t.start = t.tbody.lastElementChild.offsetTop;
+        container._packed = t;
+
+        let pending = false;
+        t.wrapper.addEventListener("scroll", function() {
+            if (pending) return;
+            pending = true;
+            requestAnimationFrame(function() { pending = false; draw(t); });
+        });
+        draw(t);
+    }
+
+    document.addEventListener("DOMContentLoaded", function() {
+        // Runs after the accordion handlers, so "active" is already set
+        document.querySelectorAll(".table-container.packed .header-bar").forEach(header => {
+            header.addEventListener("click", () => open(header.parentElement));
+        });
+        document.querySelectorAll(".table-container.packed").forEach(open);
+    });
+})();
+</script>
+"""
+
+# Packed column formats: (fmt precision, td class, bold)
+SAT_P_COLUMNS = [(3, "sticky-col", False), (2, "", False), (4, "bg-v", False), (4, "bg-v", False),
+                 (3, "bg-v val-rho", False), (1, "bg-h", False), (1, "bg-h", False), (1, "bg-h", True),
+                 (4, "", False), (4, "", False)]
+SAT_T_COLUMNS = [(1, "sticky-col", False), (3, "", False)] + SAT_P_COLUMNS[2:]
+SUPERHEATED_COLUMNS = [(4, "bg-v", False), (1, "bg-h", False), (4, "", False)]
+# Grid kinds: saturation row fields (v, h, s), v scale and caption; the
+# compressed liquid prints v in dm³/kg like v' of the saturation tables
+GRID_KINDS = {
+    "superheated": (("v_vap", "h_vap", "s_vap"), 1, "Para Przegrzana."),
+    "compressed": (("v_liq", "h_liq", "s_liq"), 1e3, "Ciecz sprężona, v [dm³/kg]."),
+}
+
 def fmt(val, precision=4, sci=False):
     """Format float to string with comma decimal. Fixes integer stripping issue."""
     if val is None or np.isnan(val):
@@ -130,23 +300,44 @@ def fmt(val, precision=4, sci=False):
         
     return s
 
-def get_prop(fluid, prop, p=None, t=None, q=None):
-    """Wrapper for CoolProp PropsSI."""
-    try:
-        args = []
-        if p is not None: args.extend(['P', p])
-        if t is not None: args.extend(['T', t + 273.15])
-        if q is not None: args.extend(['Q', q])
-        
-        return CP.PropsSI(prop, *args, fluid)
-    except:
-        return None
+def round_printed(values, precisions):
+    """Round every cell to the decimals fmt() prints for it (NaN stays NaN).
+
+    Values that round to zero are kept as they are, so their sign survives
+    (fmt() prints a tiny negative value as "-0").
+    """
+    values = np.array(values, dtype=float)
+    decimals = np.rint(-np.log10(fmt_step(values, np.asarray(precisions)))).astype(int)
+    for idx in zip(*np.nonzero(~np.isnan(values))):
+        rounded = float(f"{values[idx]:.{decimals[idx]}f}")
+        if rounded != 0:
+            values[idx] = rounded
+    return values
+
+def packed_body(values, columns, state=None, offset=0):
+    """Close a table whose body rows are embedded as packed data.
+
+    `values` are the rows x columns in printed units. They are rounded as
+    fmt() prints them first, so Float32 cannot change a printed digit.
+    """
+    values = round_printed(values, [c[0] for c in columns])
+    spec = {
+        "cols": columns,
+        "rows": len(values),
+        "offset": offset,
+        "data": base64.b64encode(values.astype("<f4").tobytes()).decode("ascii"),
+    }
+    if state is not None:
+        spec["state"] = base64.b64encode(np.asarray(state, dtype=np.uint8).tobytes()).decode("ascii")
+    yield "</tbody></table>"
+    yield f'<script type="application/json" class="packed-data">{json.dumps(spec)}</script>'
+    yield "</div></div>"
 
-def generate_sat_p_table(fluid, title, fluid_name_display, p_range, theme="theme-blue"):
-    """Generate Saturation Table (Pressure based)."""
+def generate_sat_p_table(table, title, fluid_name_display, theme="theme-blue", packed=False):
+    """Yield the HTML of the Saturation Table (Pressure based), row by row."""
     
-    html = f"""
-    <div class="table-container {theme}">
+    yield f"""
+    <div class="table-container {theme}{' packed' if packed else ''}">
         <div class="header-bar">
             <h3>{title}</h3>
             <p>Czynnik: {fluid_name_display}. Stan nasycenia (wg ciśnienia).</p>
@@ -170,24 +361,22 @@ def generate_sat_p_table(fluid, title, fluid_name_display, p_range, theme="theme
                 <tbody>
     """
     
-    for p_bar in p_range:
-        p_pa = p_bar * 1e5
-        
-        # Props
-        try:
-            t_sat = get_prop(fluid, 'T', p=p_pa, q=0) - 273.15
-            v_liq = get_prop(fluid, 'D', p=p_pa, q=0)**-1 * 1000 # dm3/kg
-            v_vap = get_prop(fluid, 'D', p=p_pa, q=1)**-1
-            rho_vap = get_prop(fluid, 'D', p=p_pa, q=1)
-            h_liq = get_prop(fluid, 'H', p=p_pa, q=0) / 1000
-            h_vap = get_prop(fluid, 'H', p=p_pa, q=1) / 1000
-            r = h_vap - h_liq
-            s_liq = get_prop(fluid, 'S', p=p_pa, q=0) / 1000
-            s_vap = get_prop(fluid, 'S', p=p_pa, q=1) / 1000
-        except:
+    sat = table.sat
+    cols = np.vstack([sat['T'] - 273.15, sat['v_liq'] * 1000, sat['v_vap'], sat['rho_vap'],
+                      sat['h_liq'] / 1000, sat['h_vap'] / 1000, sat['r'] / 1000,
+                      sat['s_liq'] / 1000, sat['s_vap'] / 1000])
+    
+    if packed:
+        valid = ~np.isnan(cols).any(axis=0)
+        yield from packed_body(np.column_stack([table.p, cols.T])[valid], SAT_P_COLUMNS)
+        return
+    
+    for p_bar, row in zip(table.p, cols.T):
+        if np.isnan(row).any():
             continue
+        t_sat, v_liq, v_vap, rho_vap, h_liq, h_vap, r, s_liq, s_vap = row
             
-        html += f"""
+        yield f"""
         <tr>
             <td class="sticky-col">{fmt(p_bar, 3)}</td>
             <td>{fmt(t_sat, 2)}</td>
@@ -202,14 +391,13 @@ def generate_sat_p_table(fluid, title, fluid_name_display, p_range, theme="theme
         </tr>
         """
         
-    html += "</tbody></table></div></div>"
-    return html
+    yield "</tbody></table></div></div>"
 
-def generate_sat_t_table(fluid, title, fluid_name_display, t_range, theme="theme-green"):
-    """Generate Saturation Table (Temperature based)."""
+def generate_sat_t_table(table, title, fluid_name_display, theme="theme-green", packed=False):
+    """Yield the HTML of the Saturation Table (Temperature based), row by row."""
     
-    html = f"""
-    <div class="table-container {theme}">
+    yield f"""
+    <div class="table-container {theme}{' packed' if packed else ''}">
         <div class="header-bar">
             <h3>{title}</h3>
             <p>Czynnik: {fluid_name_display}. Stan nasycenia (wg temperatury).</p>
@@ -233,22 +421,22 @@ def generate_sat_t_table(fluid, title, fluid_name_display, t_range, theme="theme
                 <tbody>
     """
     
-    for t_c in t_range:
-        # Props
-        try:
-            p_sat = get_prop(fluid, 'P', t=t_c, q=0) / 1000 # kPa
-            v_liq = get_prop(fluid, 'D', t=t_c, q=0)**-1 * 1000
-            v_vap = get_prop(fluid, 'D', t=t_c, q=1)**-1
-            rho_vap = get_prop(fluid, 'D', t=t_c, q=1)
-            h_liq = get_prop(fluid, 'H', t=t_c, q=0) / 1000
-            h_vap = get_prop(fluid, 'H', t=t_c, q=1) / 1000
-            r = h_vap - h_liq
-            s_liq = get_prop(fluid, 'S', t=t_c, q=0) / 1000
-            s_vap = get_prop(fluid, 'S', t=t_c, q=1) / 1000
-        except:
+    sat = table.sat
+    cols = np.vstack([sat['p'] / 1000, sat['v_liq'] * 1000, sat['v_vap'], sat['rho_vap'], # kPa
+                      sat['h_liq'] / 1000, sat['h_vap'] / 1000, sat['r'] / 1000,
+                      sat['s_liq'] / 1000, sat['s_vap'] / 1000])
+    
+    if packed:
+        valid = ~np.isnan(cols).any(axis=0)
+        yield from packed_body(np.column_stack([table.t, cols.T])[valid], SAT_T_COLUMNS)
+        return
+    
+    for t_c, row in zip(table.t, cols.T):
+        if np.isnan(row).any():
             continue
+        p_sat, v_liq, v_vap, rho_vap, h_liq, h_vap, r, s_liq, s_vap = row
             
-        html += f"""
+        yield f"""
         <tr>
             <td class="sticky-col">{fmt(t_c, 1)}</td>
             <td>{fmt(p_sat, 3)}</td>
@@ -263,37 +451,38 @@ def generate_sat_t_table(fluid, title, fluid_name_display, t_range, theme="theme
         </tr>
         """
         
-    html += "</tbody></table></div></div>"
-    return html
+    yield "</tbody></table></div></div>"
 
-def generate_superheated_table(fluid, title, fluid_name_display, p_range, t_range, theme="theme-red"):
-    """Generate Superheated Table (Cross-tab: P cols x T rows)."""
+def generate_superheated_table(table, title, fluid_name_display, theme="theme-red", packed=False):
+    """Yield the HTML of the Superheated Table (Cross-tab: P cols x T rows), row by row.
+
+    Compressed-liquid tables use the same layout with the liquid side of saturation.
+    """
+    
+    sat, grid = table.sat, table.grid
+    sat_fields, v_scale, caption = GRID_KINDS[table.kind]
+    t_sat = sat['T'] - 273.15
     
     # Header row with Pressures
     header_cols = ""
-    for p_bar in p_range:
-        # Saturation temp for this pressure
-        ts_val = get_prop(fluid, 'T', p=p_bar*1e5, q=1)
-        
-        if ts_val is not None:
-            ts = ts_val - 273.15
+    for p_bar, ts in zip(table.p, t_sat):
+        if not np.isnan(ts):
             sub_text = f'(t<sub>s</sub>={fmt(ts, 2)}°C)'
         else:
-            ts = None
             sub_text = '(Nadkryt.)'
             
         header_cols += f'<th colspan="3" style="border-bottom:1px solid #ddd">p = {fmt(p_bar, 3)} bar <br><span style="font-weight:normal">{sub_text}</span></th>'
         
     # Sub-header row (v, h, s)
     sub_header = ""
-    for _ in p_range:
+    for _ in table.p:
         sub_header += '<th class="bg-v">v</th><th class="bg-h">h</th><th>s</th>'
         
-    html = f"""
-    <div class="table-container {theme}">
+    yield f"""
+    <div class="table-container {theme}{' packed' if packed else ''}">
         <div class="header-bar">
             <h3>{title}</h3>
-            <p>Czynnik: {fluid_name_display}. Para Przegrzana.</p>
+            <p>Czynnik: {fluid_name_display}. {caption}</p>
         </div>
         <div class="table-wrapper">
             <table>
@@ -312,113 +501,204 @@ def generate_superheated_table(fluid, title, fluid_name_display, p_range, t_rang
     # Rows (Temperatures)
     
     # 1. Saturation Line
-    html += '<tr style="font-weight:bold; color:#a04000; background-color: #fff5e6"><td class="sticky-col">Stan nas.</td>'
-    for p_bar in p_range:
-        p_pa = p_bar * 1e5
-        try:
-            # Only generate saturation line properties if sub-critical
-            if get_prop(fluid, 'T', p=p_pa, q=1) is None:
-                 html += '<td colspan="3" style="font-weight:normal; font-size:0.9em">(Nadkryt.)</td>'
-            else:
-                v_vap = get_prop(fluid, 'D', p=p_pa, q=1)**-1
-                h_vap = get_prop(fluid, 'H', p=p_pa, q=1) / 1000
-                s_vap = get_prop(fluid, 'S', p=p_pa, q=1) / 1000
-                html += f'<td class="bg-v">{fmt(v_vap, 4)}</td><td class="bg-h">{fmt(h_vap, 1)}</td><td>{fmt(s_vap, 4)}</td>'
-        except:
-             html += '<td colspan="3">—</td>'
-    html += '</tr>'
+    line = '<tr style="font-weight:bold; color:#a04000; background-color: #fff5e6"><td class="sticky-col">Stan nas.</td>'
+    for row in sat:
+        # Only generate saturation line properties if sub-critical
+        if np.isnan(row['T']):
+             line += '<td colspan="3" style="font-weight:normal; font-size:0.9em">(Nadkryt.)</td>'
+        else:
+            v_sat = row[sat_fields[0]] * v_scale
+            h_sat = row[sat_fields[1]] / 1000
+            s_sat = row[sat_fields[2]] / 1000
+            line += f'<td class="bg-v">{fmt(v_sat, 4)}</td><td class="bg-h">{fmt(h_sat, 1)}</td><td>{fmt(s_sat, 4)}</td>'
+    yield line + '</tr>'
+    
+    if packed:
+        # v, h, s per pressure; other-phase (1) and failed (2) cells by state
+        cells = np.stack([grid['v'] * v_scale, grid['h'] / 1000, grid['s'] / 1000], axis=2)
+        state = np.where(table.excluded, 1, np.where(table.failed, 2, 0))
+        yield from packed_body(np.column_stack([table.t, cells.reshape(len(table.t), -1)]),
+                               [(0, "sticky-col", False)] + SUPERHEATED_COLUMNS * len(table.p),
+                               state, offset=1)
+        return
     
     # 2. Temperature Rows
-    for t_c in t_range:
-        html += f'<tr><td class="sticky-col">{fmt(t_c, 0)}</td>'
-        for p_bar in p_range:
-            p_pa = p_bar * 1e5
-            
-            # Recalculate ts safely for logic
-            ts_val = get_prop(fluid, 'T', p=p_pa, q=1)
-            ts = ts_val - 273.15 if ts_val else None
-            
-            # If T < Tsat, it's liquid -> show dash (unless supercritical, then show value if valid)
-            if ts is not None and t_c < ts:
-                 html += '<td colspan="3" style="color:#ccc">—</td>'
+    for i, t_c in enumerate(table.t):
+        line = f'<tr><td class="sticky-col">{fmt(t_c, 0)}</td>'
+        for j in range(len(table.p)):
+            # Other phase (liquid below Tsat, vapour above it) -> dash; supercritical columns are never masked
+            if table.excluded[i, j]:
+                 line += '<td colspan="3" style="color:#ccc">—</td>'
+            elif table.failed[i, j]:
+                 line += '<td colspan="3">?</td>'
             else:
-                try:
-                    # For supercritical, just calc properties at T, P
-                    v = get_prop(fluid, 'D', t=t_c, p=p_pa)**-1
-                    h = get_prop(fluid, 'H', t=t_c, p=p_pa) / 1000
-                    s = get_prop(fluid, 'S', t=t_c, p=p_pa) / 1000
-                    html += f'<td class="bg-v">{fmt(v, 4)}</td><td class="bg-h">{fmt(h, 1)}</td><td>{fmt(s, 4)}</td>'
-                except:
-                     html += '<td colspan="3">?</td>'
-        html += '</tr>'
-
-    html += "</tbody></table></div></div>"
-    return html
-
-def main():
-    content = ""
-    
-    # --- 1. Water Saturation (Pressure) ---
-    p_steps = []
-    p_steps.extend(np.arange(0.001, 0.010, 0.001)) 
-    p_steps.extend(np.arange(0.01, 0.10, 0.01))    
-    p_steps.extend(np.arange(0.1, 1.0, 0.1))       
-    p_steps.extend(np.arange(1.0, 22.1, 0.5))      
-    p_bars_water = [x * 10 for x in p_steps] # MPa -> bar
-    
-    content += generate_sat_p_table("Water", "Tablica 1. Woda nasycona (wg ciśnienia)", "Woda (H₂O)", p_bars_water, "theme-blue")
-    
-    # --- 2. Water Saturation (Temperature) ---
-    t_water = np.arange(0.01, 374, 1.0) 
-    content += generate_sat_t_table("Water", "Tablica 2. Woda nasycona (wg temperatury)", "Woda (H₂O)", t_water, "theme-green")
-    
-    # --- 3. Water Superheated ---
-    # Pressures: 0.1, 0.5, 1, 2, 5, 8, 10, 12, 15, 17, 20, 30, 40, 50, 70, 100, 120, 150, 200, 250 bar
-    p_super_mpa = [0.01, 0.05, 0.1, 0.2, 0.5, 0.8, 1.0, 1.2, 1.5, 1.7, 2.0, 3.0, 4.0, 5.0, 7.0, 10.0, 12.0, 15.0, 20.0, 25.0]
-    p_super_bar = [x * 10 for x in p_super_mpa]
-    t_super = np.arange(0, 801, 10.0)
-    
-    content += generate_superheated_table("Water", "Tablica 3. Para wodna przegrzana", "Woda (H₂O)", p_super_bar, t_super, "theme-red")
+                v = grid['v'][i, j] * v_scale
+                h = grid['h'][i, j] / 1000
+                s = grid['s'][i, j] / 1000
+                line += f'<td class="bg-v">{fmt(v, 4)}</td><td class="bg-h">{fmt(h, 1)}</td><td>{fmt(s, 4)}</td>'
+        yield line + '</tr>'
 
-    # --- 4. R134a Saturation ---
-    t_r134a = np.arange(-50, 101, 1.0)
-    content += generate_sat_t_table("R134a", "Tablica 4. R134a nasycony (wg temperatury)", "R134a", t_r134a, "theme-cyan")
-    
-    p_r134a = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 12, 14, 16, 18, 20, 25, 30, 35, 40]
-    content += generate_sat_p_table("R134a", "Tablica 5. R134a nasycony (wg ciśnienia)", "R134a", p_r134a, "theme-cyan")
+    yield "</tbody></table></div></div>"
 
-    # --- 5. R290 Saturation ---
-    t_r290 = np.arange(-50, 96, 1.0)
-    content += generate_sat_t_table("R290", "Tablica 6. R290 (Propan) nasycony (wg temperatury)", "R290 (Propan)", t_r290, "theme-orange")
-    
-    p_r290 = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 12, 14, 16, 18, 20, 25, 30, 35, 40]
-    content += generate_sat_p_table("R290", "Tablica 7. R290 (Propan) nasycony (wg ciśnienia)", "R290 (Propan)", p_r290, "theme-orange")
-    
-    # --- 6. R290 Superheated ---
-    p_super_r290 = [1.0, 5.0, 15.0]
-    t_super_r290 = np.arange(-50, 150, 10.0)
-    content += generate_superheated_table("R290", "Tablica 8. R290 (Propan) przegrzany", "R290 (Propan)", p_super_r290, t_super_r290, "theme-orange")
+# Renderer per table kind
+RENDERERS = {"sat_p": generate_sat_p_table, "sat_t": generate_sat_t_table,
+             "superheated": generate_superheated_table, "compressed": generate_superheated_table}
+
+# Document order from the fluid registry: (table key, renderer, title, fluid display name, theme)
+LAYOUT = [(spec["key"], RENDERERS[spec["kind"]], title, display, f"theme-{theme}")
+          for spec, title, display, theme in document("html")]
+
+def table_digests(specs=TABLES, packed=False):
+    """build_manifest digest of every table in LAYOUT."""
+    specs = {spec["key"]: spec for spec in specs}
+    return {key: table_digest(specs[key], "generate_tables_coolprop", RENDERER_VERSION,
+                              render.__name__, title, display, theme, packed)
+            for key, render, title, display, theme in LAYOUT}
+
+def render_document(tables, packed=False, digests=None, layout=LAYOUT):
+    """Yield the full HTML document, fragment by fragment.
+
+    With `digests`, tables missing from `tables` are spliced from their
+    stored fragments and the rendered ones are stored. `layout` selects
+    the tables (one per file in split mode).
+    """
+    yield f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<title>Tablice Termodynamiczne</title>
+{CSS}{PACKED_CSS if packed else ""}
+</head>
+<body>
+<h1>Tablice Termodynamiczne</h1>
+<p style="color: #666; font-size: 0.9em;">Wygenerowano automatycznie przy użyciu CoolProp (v{CoolProp.__version__}).</p>
+"""
 
-    # Final HTML
-    full_html = f"""<!DOCTYPE html>
+    for key, render, title, display, theme in layout:
+        if key not in tables:
+            yield from read_fragment(digests[key])
+        elif digests:
+            yield from record_fragment(digests[key], render(tables[key], title, display, theme, packed))
+        else:
+            yield from render(tables[key], title, display, theme, packed)
+
+    yield """
+</body>
+</html>
+"""
+
+def render_index(entries):
+    """Yield the split-mode index page; `entries` are (file, title, display, theme, size)."""
+    yield f"""<!DOCTYPE html>
 <html>
 <head>
 <meta charset="UTF-8">
 <title>Tablice Termodynamiczne</title>
-{CSS}
+{CSS}{INDEX_CSS}
 </head>
 <body>
 <h1>Tablice Termodynamiczne</h1>
 <p style="color: #666; font-size: 0.9em;">Wygenerowano automatycznie przy użyciu CoolProp (v{CoolProp.__version__}).</p>
-{content}
+"""
+    for name, title, display, theme, size in entries:
+        yield f"""
+    <a class="table-container table-link {theme}" href="{name}">
+        <div class="header-bar">
+            <h3>{title}</h3>
+            <p>Czynnik: {display}. {size / 1024:.0f} kB</p>
+        </div>
+    </a>"""
+    yield """
 </body>
 </html>
 """
+
+def write_split(directory, tables, packed=False, digests=None):
+    """Write every table as its own document plus index.html; returns the paths, index first."""
+    os.makedirs(directory, exist_ok=True)
+    entries, paths = [], []
+    for entry in LAYOUT:
+        key, _, title, display, theme = entry
+        path = os.path.join(directory, f"{key}.html")
+        with open(path, "w", encoding="utf-8", buffering=1 << 16) as f:
+            f.writelines(render_document(tables, packed, digests, [entry]))
+        entries.append((f"{key}.html", title, display, theme, os.path.getsize(path)))
+        paths.append(path)
+    index = os.path.join(directory, "index.html")
+    with open(index, "w", encoding="utf-8") as f:
+        f.writelines(render_index(entries))
+    return [index] + paths
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the thermodynamic property tables.")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="evaluate table row chunks in this many processes (default: 1)")
+    parser.add_argument("--domain-log", metavar="PATH",
+                        help="write skipped out-of-domain cells and EOS failures as JSON")
+    parser.add_argument("--stats", metavar="PATH",
+                        help="property-call report path (default: .cache/reports/)")
+    parser.add_argument("--sidecar-dir", metavar="DIR",
+                        help="per-table .npz/.csv exports (default: Cwiczenia/xml/tablice_dane/)")
+    parser.add_argument("--packed", action="store_true",
+                        help="embed table rows as packed data and draw only the rows in view (needs JavaScript)")
+    parser.add_argument("--split", metavar="DIR",
+                        help="write each table as its own page plus an index.html linking them, "
+                             "instead of one document")
+    parser.add_argument("--adaptive", type=float, metavar="RTOL",
+                        help="choose the saturation-table rows from a fine grid so that linear "
+                             "interpolation between rows stays within this relative error (e.g. 0.005)")
+    parser.add_argument("--interp-report", metavar="DIR",
+                        help="write the interpolation-error report (JSON + heatmap PNG) of all tables")
+    parser.add_argument("--no-compress", action="store_true",
+                        help="skip the precompressed .gz/.br copies of the HTML")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="ignore the build manifest and recompute every table")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        f.write(full_html)
+    sidecar_dir = args.sidecar_dir or SIDECAR_DIR
+    
+    # Saturation rows picked for an interpolation-error target instead of fixed steps
+    specs = refined_specs(TABLES, args.adaptive) if args.adaptive else TABLES
+    
+    # Only tables whose digest changed since the last build are evaluated and rendered
+    manifest = "generate_tables_coolprop-packed" if args.packed else "generate_tables_coolprop"
+    digests = table_digests(specs, args.packed)
+    stale = list(digests) if args.full_rebuild else stale_keys(manifest, digests, specs, sidecar_dir)
+    tables = build_tables([spec for spec in specs if spec["key"] in stale], jobs=args.jobs)
+    
+    # Fragments go straight to the file through a 64 kB buffer
+    if args.split:
+        outputs = write_split(args.split, tables, args.packed, digests)
+    else:
+        outputs = [OUTPUT_FILE]
+        with open(OUTPUT_FILE, "w", encoding="utf-8", buffering=1 << 16) as f:
+            f.writelines(render_document(tables, args.packed, digests))
         
-    print(f"Generated {OUTPUT_FILE}")
+    print(f"Generated {outputs[0]} ({len(stale)} of {len(LAYOUT)} table(s) rebuilt)")
+    
+    # Same numbers, machine-readable
+    write_sidecars(tables, sidecar_dir, specs)
+    write_manifest(manifest, digests)
+    print(f"Sidecars: {sidecar_dir}")
+    if args.interp_report:
+        # Imported here: the report pulls in matplotlib, which plain builds do not need
+        from interpolation_report import report_sidecars
+
+        # Read back from the sidecars, which hold every table even after an incremental build
+        for line in report_sidecars(sidecar_dir, args.interp_report):
+            print(f"Interpolation error {line}")
+    print(eos_domain.summary())
+    if args.domain_log:
+        eos_domain.write_log(args.domain_log)
+    print(engine_stats.summary())
+    sizes = [] if args.no_compress else compress(outputs)
+    if sizes:
+        print(precompress_summary(sizes))
+    report = engine_stats.write_report("generate_tables_coolprop", args.stats, artifacts=sizes)
+    print(f"Stats report: {report}")
 
 if __name__ == "__main__":
     main()
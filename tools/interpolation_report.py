@@ -0,0 +1,204 @@
+"""
+Interpolation-error map of the published tables.
+
+For every table, linear interpolation halfway between adjacent rows (and,
+in the superheated and compressed-liquid tables, between adjacent
+pressure columns) is compared with the exact HEOS value at that midpoint.
+All midpoints of a table go to the property engine in one batched call. Errors are relative, in the
+printed units, with values near zero measured against 0.1% of the
+column's largest magnitude (the row_refinement metric).
+
+write_report() saves interp_errors.json (per-table maximum, percentiles
+and the worst spot) and interp_errors.png (one heatmap per table) and
+returns the one-line summaries. Run on its own, it reads the tables from
+the sidecar directory written by the generators.
+"""
+
+import argparse
+import json
+import os
+
+import CoolProp
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import LogNorm
+
+from property_engine import BACKEND, evaluate, saturation_rows
+from row_refinement import FLOOR
+from table_export import SIDECAR_DIR, read_index, read_table
+
+PERCENTILES = (50, 95, 99)
+SUPERHEATED_FIELDS = ("v", "h", "s")
+
+
+def _printed(rows, field):
+    return rows[field] - 273.15 if field == "T" else rows[field]
+
+
+def _relative(approx, exact, values):
+    # Percent error; the floor is per column (last axis of `values` spans the rows)
+    floor = FLOOR * np.nanmax(np.abs(values), axis=-1, keepdims=True)
+    return 100 * np.abs(approx - exact) / np.maximum(np.abs(exact), floor)
+
+
+def saturation_errors(table):
+    """(fields, errors) with errors of shape (fields, rows - 1), percent."""
+    x = table.p if table.kind == "sat_p" else table.t
+    mid = (x[:-1] + x[1:]) / 2
+    if table.kind == "sat_p":
+        exact = saturation_rows(table.fluid, p=mid * 1e5)
+    else:
+        exact = saturation_rows(table.fluid, t=mid + 273.15)
+
+    fields = [f for f in table.sat.dtype.names if f != ("p" if table.kind == "sat_p" else "T")]
+    y = np.array([_printed(table.sat, f) for f in fields])
+    approx = (y[:, :-1] + y[:, 1:]) / 2
+    return fields, _relative(approx, np.array([_printed(exact, f) for f in fields]), y)
+
+
+def superheated_errors(table):
+    """Worst of v, h, s per midpoint: (along t, shape (t - 1, p); along p, shape (t, p - 1))."""
+    grid = {f: table.grid[f] for f in SUPERHEATED_FIELDS}
+    along_t = np.meshgrid((table.t[:-1] + table.t[1:]) / 2, table.p, indexing="ij")
+    along_p = np.meshgrid(table.t, (table.p[:-1] + table.p[1:]) / 2, indexing="ij")
+    # Only between two evaluated cells; the midpoint is then in the same phase
+    need_t = ~np.isnan(grid["v"][:-1] + grid["v"][1:])
+    need_p = ~np.isnan(grid["v"][:, :-1] + grid["v"][:, 1:])
+
+    t = np.concatenate([along_t[0][need_t], along_p[0][need_p]]) + 273.15
+    p = np.concatenate([along_t[1][need_t], along_p[1][need_p]]) * 1e5
+    d, h, s = evaluate(table.fluid, ["D", "H", "S"], p=p, t=t)
+    exact = dict(zip(SUPERHEATED_FIELDS, (1 / d, h, s)))
+
+    n = need_t.sum()
+    errors = []
+    for need, lo, hi, part in ((need_t, np.s_[:-1], np.s_[1:], np.s_[:n]),
+                               (need_p, np.s_[:, :-1], np.s_[:, 1:], np.s_[n:])):
+        worst = np.full(need.shape, np.nan)
+        for f in SUPERHEATED_FIELDS:
+            values = np.full(need.shape, np.nan)
+            values[need] = exact[f][part]
+            err = _relative((grid[f][lo] + grid[f][hi]) / 2, values, grid[f].ravel())
+            worst = np.fmax(worst, err)
+        errors.append(worst)
+    return tuple(errors)
+
+
+def _stats(errors):
+    finite = errors[np.isfinite(errors)]
+    if not finite.size:
+        return {"midpoints": 0, "max": None}
+    return {"midpoints": int(finite.size), "max": float(finite.max()),
+            **{f"p{q}": float(np.percentile(finite, q)) for q in PERCENTILES}}
+
+
+def table_report(table):
+    """Stats, worst spot and heatmap panels of one table."""
+    if table.kind in ("superheated", "compressed"):
+        along_t, along_p = superheated_errors(table)
+        stats = _stats(np.concatenate([along_t.ravel(), along_p.ravel()]))
+        if stats["max"] is not None:
+            use_t = np.nanmax(along_t, initial=-1) >= np.nanmax(along_p, initial=-1)
+            errors = along_t if use_t else along_p
+            i, j = np.unravel_index(np.nanargmax(errors), errors.shape)
+            if use_t:
+                stats["worst"] = f"t between {table.t[i]:g} and {table.t[i + 1]:g} °C at {table.p[j]:g} bar"
+            else:
+                stats["worst"] = f"p between {table.p[j]:g} and {table.p[j + 1]:g} bar at {table.t[i]:g} °C"
+        panels = [("along t", along_t, "p [bar]", table.p, "t [°C]", table.t[:-1]),
+                  ("along p", along_p, "p [bar], interval start", table.p[:-1], "t [°C]", table.t)]
+    else:
+        fields, errors = saturation_errors(table)
+        x = table.p if table.kind == "sat_p" else table.t
+        stats = _stats(errors)
+        if stats["max"] is not None:
+            k, i = np.unravel_index(np.nanargmax(errors), errors.shape)
+            stats["worst"] = f"{fields[k]} between {x[i]:g} and {x[i + 1]:g} {'bar' if table.kind == 'sat_p' else '°C'}"
+        stats["columns"] = {f: _stats(e) for f, e in zip(fields, errors)}
+        xlabel = "p [bar]" if table.kind == "sat_p" else "t [°C]"
+        panels = [("", errors, f"{xlabel}, interval start", x[:-1], None, fields)]
+    return stats, panels
+
+
+def _ticks(values, count=8):
+    idx = np.unique(np.linspace(0, len(values) - 1, min(count, len(values))).astype(int))
+    return idx, [v if isinstance(v, str) else f"{v:g}" for v in np.asarray(values, dtype=object)[idx]]
+
+
+def plot(reports, path):
+    """One heatmap per table panel on a shared logarithmic colour scale [%].
+
+    Nothing is written when no table has a panel (e.g. no tables at all).
+    """
+    panels = [(key, *panel) for key, (_, key_panels) in reports.items() for panel in key_panels]
+    if not panels:
+        return
+    finite = [e[np.isfinite(e) & (e > 0)] for _, _, e, *_ in panels]
+    finite = np.concatenate(finite) if finite else np.array([])
+    vmax = finite.max() if finite.size else 1.0
+    norm = LogNorm(vmin=max(vmax * 1e-5, 1e-6), vmax=vmax)
+
+    rows = (len(panels) + 1) // 2
+    fig, axes = plt.subplots(rows, 2, figsize=(14, 3.2 * rows), squeeze=False, layout="constrained")
+    for ax, (key, label, errors, xlabel, xvalues, ylabel, yvalues) in zip(axes.flat, panels):
+        # Saturation panels: properties x row intervals; superheated: t x p
+        image = ax.imshow(np.where(errors > 0, errors, np.nan), aspect="auto", norm=norm,
+                          cmap="viridis", interpolation="nearest", origin="lower")
+        ax.set_title(f"{key} {label}".strip(), fontsize=10)
+        ax.set_xticks(*_ticks(xvalues))
+        ax.set_xlabel(xlabel)
+        if ylabel is None:
+            ax.set_yticks(range(len(yvalues)), yvalues, fontsize=7)
+        else:
+            ax.set_yticks(*_ticks(yvalues))
+            ax.set_ylabel(ylabel)
+    for ax in axes.flat[len(panels):]:
+        ax.axis("off")
+    fig.colorbar(image, ax=axes, label="linear interpolation error [%]", shrink=0.6)
+    fig.savefig(path, dpi=120, bbox_inches="tight")
+    plt.close(fig)
+
+
+def write_report(tables, directory):
+    """Write interp_errors.json / .png for {key: Table}; returns summary lines."""
+    os.makedirs(directory, exist_ok=True)
+    reports = {key: table_report(table) for key, table in tables.items()}
+
+    with open(os.path.join(directory, "interp_errors.json"), "w", encoding="utf-8") as f:
+        json.dump({"coolprop": CoolProp.__version__, "reference": BACKEND,
+                   "tables": {key: stats for key, (stats, _) in reports.items()}},
+                  f, indent=1, ensure_ascii=False)
+    plot(reports, os.path.join(directory, "interp_errors.png"))
+
+    lines = []
+    for key, (stats, _) in reports.items():
+        if stats["max"] is None:
+            lines.append(f"{key}: no midpoints")
+            continue
+        lines.append(f"{key}: max {stats['max']:.3g}% ({stats['worst']}), "
+                     + ", ".join(f"p{q} {stats[f'p{q}']:.3g}%" for q in PERCENTILES))
+    return lines
+
+
+def report_sidecars(sidecar_dir, directory=None):
+    """write_report() for every table in a sidecar directory."""
+    tables = {entry["key"]: read_table(sidecar_dir, entry["key"])
+              for entry in read_index(sidecar_dir)["tables"]}
+    return write_report(tables, directory or sidecar_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Interpolation-error map of the generated tables.")
+    parser.add_argument("--sidecar-dir", default=SIDECAR_DIR, help="table exports to read")
+    parser.add_argument("--out", default=None, metavar="DIR",
+                        help="report directory (default: the sidecar directory)")
+    args = parser.parse_args(argv)
+
+    for line in report_sidecars(args.sidecar_dir, args.out):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Streaming writer for Moodle XML quiz files.
+
+write_quiz() writes the <quiz> root and the question elements (ElementTree)
+straight to the file, element by element, in the layout the generators
+used to get from minidom's toprettyxml(): 4-space indent, an element with
+a single text child on one line, empty elements as <tag/>. Nothing is
+serialised to an intermediate string or parsed again, so time and memory
+grow linearly with the number of questions and dataset items.
+
+HTML fields (the text of an element with format="html") are always written
+as CDATA sections, as Moodle exports them, instead of entity-escaped
+markup; the same goes for any text the generators wrap in '<![CDATA[...]]>'
+themselves.
+Whitespace between child elements (the indentation of a parsed file) is
+dropped and replaced by the writer's own.
+
+share_datasets() is the compact mode for calculated questions: a dataset
+that several questions of a category use identically is marked 'shared'
+and only its first use keeps the items. On import Moodle creates the
+shared dataset, items included, with the first question; a later
+definition with status 'shared' and the same name and options
+(distribution, minimum, maximum, decimals) in the same category is linked
+to it, and its own items and counts are not read.
+"""
+
+DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+INDENT = "    "
+CDATA_START = "<![CDATA["
+CDATA_END = "]]>"
+
+
+def _escape(text):
+    # Same entities as minidom, in text and attribute values alike
+    return (text.replace("&", "&amp;").replace("<", "&lt;")
+            .replace('"', "&quot;").replace(">", "&gt;"))
+
+
+def cdata(text):
+    """`text` as a CDATA section; a ']]>' inside is split over two sections."""
+    return CDATA_START + text.replace(CDATA_END, "]]]]><![CDATA[>") + CDATA_END
+
+
+def _text(text, html):
+    # Generator-wrapped '<![CDATA[...]]>' text counts as an HTML field
+    if text.startswith(CDATA_START) and text.endswith(CDATA_END):
+        text, html = text[len(CDATA_START):-len(CDATA_END)], True
+    return cdata(text) if html else _escape(text)
+
+
+def _children(elem):
+    # Child nodes in document order: text, then each element and its tail;
+    # whitespace-only text next to elements is formatting
+    nodes = []
+    for node in [elem.text] + [n for child in elem for n in (child, child.tail)]:
+        if isinstance(node, str):
+            if node.strip() or (node and not len(elem)):
+                nodes.append(node)
+        elif node is not None:
+            nodes.append(node)
+    return nodes
+
+
+def write_element(f, elem, level=0, html=False):
+    """Write one element and its subtree to the text file `f`, indented by `level`.
+
+    `html` marks the element as the text of an HTML field.
+    """
+    indent = INDENT * level
+    f.write(f"{indent}<{elem.tag}")
+    for name, value in elem.attrib.items():
+        f.write(f' {name}="{_escape(value)}"')
+
+    children = _children(elem)
+    child_html = elem.get("format") == "html"
+    if not children:
+        f.write("/>\n")
+    elif len(children) == 1 and isinstance(children[0], str):
+        f.write(f">{_text(children[0], html)}</{elem.tag}>\n")
+    else:
+        f.write(">\n")
+        for child in children:
+            if isinstance(child, str):
+                f.write(_escape(f"{indent}{INDENT}{child}\n"))
+            else:
+                write_element(f, child, level + 1, child_html)
+        f.write(f"{indent}</{elem.tag}>\n")
+
+
+def _definition(dd):
+    # Everything Moodle stores for a dataset: options and items
+    return tuple((e.tag, (e.text or "").strip()) for e in dd.iter())
+
+
+def share_datasets(questions):
+    """Make datasets used identically by several questions shared, in place.
+
+    Datasets are grouped per category (the category question before them).
+    The first definition of a group keeps its items; the later ones keep
+    status, options and counts and lose their dataset_item elements. A name
+    used with different values in different questions of a category stays
+    private in all of them. Returns the number of dataset_item elements
+    dropped.
+    """
+    uses = {}
+    category = None
+    for question in questions:
+        if question.get("type") == "category":
+            category = question.findtext("category/text")
+            continue
+        for dd in question.iterfind("dataset_definitions/dataset_definition"):
+            uses.setdefault((category, dd.findtext("name/text")), []).append(dd)
+
+    dropped = 0
+    for definitions in uses.values():
+        if len(definitions) < 2 or len({_definition(dd) for dd in definitions}) > 1:
+            continue
+        for i, dd in enumerate(definitions):
+            dd.find("status/text").text = "shared"
+            items = dd.find("dataset_items")
+            if i and items is not None:
+                dropped += len(items)
+                items.clear()
+    return dropped
+
+
+def write_quiz(path, questions, declaration=DECLARATION):
+    """Write the question elements as a <quiz> document to `path`."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{declaration}\n<quiz>\n")
+        for question in questions:
+            write_element(f, question, 1)
+        f.write("</quiz>\n")
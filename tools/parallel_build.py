@@ -0,0 +1,45 @@
+"""
+Process-pool execution of table build parts.
+
+Work is split into parts, (function, args) pairs such as the row chunks
+of a table (see table_data). run_parts() evaluates them serially or in a
+process pool. pool.map keeps the submission order, so the results - and
+the tables assembled from them - are identical to a serial build.
+Workers hand their eos_domain log records and engine_stats counters back
+with each part.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import engine_stats
+import eos_domain
+
+CHUNK_ROWS = 40
+
+
+def row_chunks(values, size=CHUNK_ROWS):
+    """Split table rows into (start_index, rows) chunks."""
+    values = list(values)
+    return [(i, values[i:i + size]) for i in range(0, len(values), size)]
+
+
+def _run(part):
+    func, args = part
+    return func(*args)
+
+
+def _run_logged(part):
+    return _run(part), eos_domain.take_records(), engine_stats.take()
+
+
+def run_parts(parts, jobs=1):
+    """Evaluate (function, args) parts in order; in `jobs` processes if > 1."""
+    if jobs <= 1:
+        return [_run(part) for part in parts]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = []
+        for result, records, stats in pool.map(_run_logged, parts):
+            eos_domain.merge(records)
+            engine_stats.merge(stats)
+            results.append(result)
+        return results
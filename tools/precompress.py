@@ -0,0 +1,59 @@
+"""
+Precompressed copies of the generated HTML for static serving.
+
+compress() writes <file>.gz and <file>.br next to every artifact so a web
+server can send them as they are (nginx gzip_static / brotli_static,
+Apache MultiViews) instead of compressing on each request. Settings are
+fixed and no timestamps or file names are stored, so unchanged HTML gives
+byte-identical archives. The .br variant needs the brotli package; without
+it only .gz is written and an old .br is removed rather than left stale.
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+BROTLI_LGWIN = 22
+
+
+def _write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def compress(paths):
+    """Write the .gz / .br variants of `paths`; returns one size row per file."""
+    rows = []
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        row = {"file": path, "bytes": len(data),
+               "gzip": _write(f"{path}.gz", gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)),
+               "brotli": None}
+        if brotli is not None:
+            packed = brotli.compress(data, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY, lgwin=BROTLI_LGWIN)
+            row["brotli"] = _write(f"{path}.br", packed)
+        elif os.path.exists(f"{path}.br"):
+            os.remove(f"{path}.br")
+        rows.append(row)
+    return rows
+
+
+def summary(rows):
+    """One-line size digest of compress() rows."""
+    total = sum(row["bytes"] for row in rows)
+
+    def saved(name):
+        size = sum(row[name] for row in rows)
+        return f"{name} {size / 1024:.0f} kB (-{100 * (1 - size / total):.0f}%)" if total else f"{name} 0 kB"
+
+    brotli_part = saved("brotli") if brotli is not None else "brotli skipped (package not installed)"
+    return (f"Precompressed {len(rows)} file(s): {total / 1024:.0f} kB -> "
+            f"{saved('gzip')}, {brotli_part}")
@@ -0,0 +1,92 @@
+"""
+Content-addressed on-disk cache for property-engine results.
+
+Each result array is stored as one .npy file named by the SHA-256 of the
+function name, its version and its arguments (fluid, input pair, outputs
+and the raw input values). The version is a hash of the function's source
+and of the module-level values it depends on (e.g. SATURATION_DTYPE), so
+editing either misses the old entries instead of serving stale arrays.
+Files live in a directory per CoolProp version, so upgrading CoolProp
+starts from an empty cache automatically.
+
+Set PROPERTY_CACHE_DIR to move the cache, or `enabled = False` to bypass it.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+
+import CoolProp
+import numpy as np
+
+import engine_stats
+
+CACHE_DIR = os.environ.get(
+    "PROPERTY_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "properties"),
+)
+
+enabled = True
+
+
+def _digest(name, args):
+    """SHA-256 over the function name and its (array or scalar) arguments."""
+    h = hashlib.sha256(name.encode())
+    for arg in args:
+        if isinstance(arg, np.ndarray):
+            arr = np.ascontiguousarray(arg, dtype=float)
+            h.update(repr(arr.shape).encode())
+            h.update(arr.tobytes())
+        else:
+            h.update(repr(arg).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def function_version(func, depends=()):
+    """SHA-256 over the source of `func` and the repr of the values it `depends` on."""
+    h = hashlib.sha256(inspect.getsource(func).encode())
+    for value in depends:
+        h.update(repr(value).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def cache_path(name, args):
+    """Location of the cached result for a call."""
+    return os.path.join(CACHE_DIR, CoolProp.__version__, _digest(name, args) + ".npy")
+
+
+def cached(*depends):
+    """Memoise an array-returning function on disk (positional args only).
+
+    Used as @cached(VALUE, ...): the values the function's result depends
+    on besides its source and arguments (dtypes, constants) join the key.
+    """
+    def decorate(func):
+        return _cached(func, function_version(func, depends))
+    return decorate
+
+
+def _cached(func, version):
+    @functools.wraps(func)
+    def wrapper(*args):
+        if not enabled:
+            return func(*args)
+
+        path = cache_path(f"{func.__qualname__}@{version}", args)
+        if os.path.exists(path):
+            engine_stats.record_cache(func.__qualname__, True)
+            return np.load(path)
+        engine_stats.record_cache(func.__qualname__, False)
+
+        result = func(*args)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, result)
+        os.replace(tmp, path)
+        return result
+
+    return wrapper
@@ -0,0 +1,207 @@
+"""
+Batched CoolProp property engine shared by the table generators.
+
+Holds one CoolProp AbstractState per fluid and evaluates whole NumPy
+arrays of (P,T), (P,Q), (T,Q), (H,P) or (P,S) inputs in one call, so the
+fluid string and input pair are parsed once per table instead of once
+per cell. Results are memoised on disk by property_cache.
+
+All inputs and outputs are SI (Pa, K, kg/m³, J/kg, J/(kg·K)).
+Inputs outside the EOS domain (see eos_domain) are skipped without a
+flash; they and states that CoolProp cannot compute come back as NaN
+and are recorded in the eos_domain log. Calls, states and timings are
+counted by engine_stats.
+"""
+
+import time
+
+import CoolProp.CoolProp as CP
+import numpy as np
+
+import engine_stats
+import eos_domain
+from property_cache import cached
+
+# CoolProp backend of every state (the full Helmholtz-energy EOS)
+BACKEND = "HEOS"
+
+# Input pair for each (sorted) combination of given inputs.
+# The update() arguments follow the order of the key.
+INPUT_PAIRS = {
+    ("H", "P"): CP.HmassP_INPUTS,
+    ("P", "Q"): CP.PQ_INPUTS,
+    ("P", "S"): CP.PSmass_INPUTS,
+    ("P", "T"): CP.PT_INPUTS,
+    ("Q", "T"): CP.QT_INPUTS,
+}
+
+# Columns returned by saturation_rows() (SI units).
+SATURATION_DTYPE = np.dtype([
+    ("T", float), ("p", float),
+    ("v_liq", float), ("v_vap", float), ("rho_vap", float),
+    ("h_liq", float), ("h_vap", float), ("r", float),
+    ("s_liq", float), ("s_vap", float),
+])
+
+# Cells returned by superheated_grid() and compressed_liquid_grid() (SI units).
+SUPERHEATED_DTYPE = np.dtype([("v", float), ("h", float), ("s", float)])
+
+_states = {}
+
+
+def get_state(fluid):
+    """Return the cached AbstractState for a fluid."""
+    if fluid not in _states:
+        _states[fluid] = CP.AbstractState(BACKEND, fluid)
+    return _states[fluid]
+
+
+def evaluate(fluid, outputs, p=None, t=None, q=None, h=None, s=None):
+    """Evaluate `outputs` (e.g. ['D', 'H', 'S']) for arrays of inputs.
+
+    Exactly two of p [Pa], t [K], q [-], h [J/kg], s [J/(kg·K)] must be
+    given; they are broadcast against each other. Returns one array per
+    output, in order.
+    """
+    given = {k: v for k, v in (("H", h), ("P", p), ("Q", q), ("S", s), ("T", t))
+             if v is not None}
+    names = tuple(sorted(given))
+    if names not in INPUT_PAIRS:
+        raise ValueError(f"Unsupported input pair: {names}")
+
+    started = time.perf_counter()
+    a, b = np.broadcast_arrays(*(np.asarray(given[n], dtype=float) for n in names))
+
+    # Only cells inside the EOS domain are flashed
+    reasons = eos_domain.check(fluid, names, a, b)
+    valid = reasons == ""
+    result = np.full((len(outputs),) + a.shape, np.nan)
+    result[:, valid] = _evaluate_pair(fluid, names, tuple(outputs), a[valid], b[valid])
+
+    failed = valid & np.isnan(result).any(axis=0)
+    eos_domain.record(eos_domain.SKIPPED, BACKEND, fluid, names, a, b, ~valid, reasons)
+    eos_domain.record(eos_domain.FAILED, BACKEND, fluid, names, a, b, failed)
+    engine_stats.record_call(BACKEND, fluid, names, outputs, a.size, (~valid).sum(),
+                             failed.sum(), time.perf_counter() - started)
+    return tuple(result)
+
+
+@cached(BACKEND, INPUT_PAIRS)
+def _evaluate_pair(fluid, names, outputs, a, b):
+    """Stacked (len(outputs), *a.shape) array for one input pair."""
+    keys = [CP.get_parameter_index(o) for o in outputs]
+    pair = INPUT_PAIRS[names]
+    state = get_state(fluid)
+    started = time.perf_counter()
+
+    flat_a, flat_b = a.ravel(), b.ravel()
+    result = np.full((len(keys), flat_a.size), np.nan)
+    for i in range(flat_a.size):
+        try:
+            state.update(pair, flat_a[i], flat_b[i])
+            result[:, i] = [state.keyed_output(key) for key in keys]
+        except ValueError:
+            continue
+
+    engine_stats.record_flash(BACKEND, fluid, names, flat_a.size, time.perf_counter() - started)
+    return result.reshape((len(keys),) + a.shape)
+
+
+def saturation_rows(fluid, p=None, t=None):
+    """Saturation table rows for an array of pressures [Pa] or temperatures [K].
+
+    One saturation flash per input yields both the liquid (') and vapour ('')
+    states. Returns a SATURATION_DTYPE structured array; rows that cannot be
+    computed are NaN.
+    """
+    if (p is None) == (t is None):
+        raise ValueError("Give exactly one of p or t")
+    started = time.perf_counter()
+    given, x = ("P", p) if p is not None else ("T", t)
+    x = np.asarray(x, dtype=float)
+    names, q = tuple(sorted((given, "Q"))), np.zeros(x.shape)
+    pair = (x, q) if given == "P" else (q, x)
+
+    # Only rows between the triple and the critical point are flashed
+    reasons = eos_domain.check(fluid, names, *pair)
+    valid = reasons == ""
+    rows = np.full(x.shape, np.nan, dtype=SATURATION_DTYPE)
+    rows[valid] = _saturation_rows(fluid, given, x[valid])
+
+    failed = valid & np.isnan(rows["T"])
+    eos_domain.record(eos_domain.SKIPPED, BACKEND, fluid, names, *pair, ~valid, reasons)
+    eos_domain.record(eos_domain.FAILED, BACKEND, fluid, names, *pair, failed)
+    engine_stats.record_call(BACKEND, fluid, names, SATURATION_DTYPE.names, x.size,
+                             (~valid).sum(), failed.sum(), time.perf_counter() - started)
+    return rows
+
+
+@cached(BACKEND, SATURATION_DTYPE)
+def _saturation_rows(fluid, given, x):
+    state = get_state(fluid)
+    started = time.perf_counter()
+
+    rows = np.full(x.shape, np.nan, dtype=SATURATION_DTYPE)
+    for i, val in np.ndenumerate(x):
+        try:
+            if given == "P":
+                state.update(CP.PQ_INPUTS, val, 0)
+            else:
+                state.update(CP.QT_INPUTS, 0, val)
+            d_liq = state.saturated_liquid_keyed_output(CP.iDmass)
+            d_vap = state.saturated_vapor_keyed_output(CP.iDmass)
+            h_liq = state.saturated_liquid_keyed_output(CP.iHmass)
+            h_vap = state.saturated_vapor_keyed_output(CP.iHmass)
+            rows[i] = (state.T(), state.p(), 1 / d_liq, 1 / d_vap, d_vap,
+                       h_liq, h_vap, h_vap - h_liq,
+                       state.saturated_liquid_keyed_output(CP.iSmass),
+                       state.saturated_vapor_keyed_output(CP.iSmass))
+        except ValueError:
+            continue
+
+    names = ("P", "Q") if given == "P" else ("Q", "T")
+    engine_stats.record_flash(BACKEND, fluid, names, x.size, time.perf_counter() - started)
+    return rows
+
+
+def _single_phase_grid(fluid, p, t, vapour_side):
+    # One saturation flash per pressure, then one batched (P,T) evaluation of
+    # the cells on the requested side of t_sat; the other side stays NaN
+    p = np.asarray(p, dtype=float)
+    t = np.asarray(t, dtype=float)
+    sat = saturation_rows(fluid, p=p)
+
+    if vapour_side:
+        excluded = t[:, None] < sat["T"][None, :]
+    else:
+        excluded = t[:, None] > sat["T"][None, :]
+    single = ~excluded
+    P, T = np.broadcast_arrays(p[None, :], t[:, None])
+
+    grid = np.full(excluded.shape, np.nan, dtype=SUPERHEATED_DTYPE)
+    d, h, s = evaluate(fluid, ["D", "H", "S"], p=P[single], t=T[single])
+    grid["v"][single] = 1 / d
+    grid["h"][single] = h
+    grid["s"][single] = s
+    return sat, excluded, grid
+
+
+def superheated_grid(fluid, p, t):
+    """Single-phase v, h, s over a t x p grid (t along rows, p along columns).
+
+    Saturation is flashed once per pressure [Pa]. Cells below t_sat [K] are
+    masked as liquid and never reach the EOS; above the critical pressure
+    t_sat is NaN and the whole column is evaluated.
+    Returns (sat, liquid, grid) with grid a SUPERHEATED_DTYPE array.
+    """
+    return _single_phase_grid(fluid, p, t, True)
+
+
+def compressed_liquid_grid(fluid, p, t):
+    """Compressed-liquid v, h, s over a t x p grid, as superheated_grid().
+
+    Cells above t_sat [K] are masked as vapour instead; supercritical
+    columns are evaluated whole.
+    Returns (sat, vapour, grid) with grid a SUPERHEATED_DTYPE array.
+    """
+    return _single_phase_grid(fluid, p, t, False)
@@ -0,0 +1,103 @@
+"""
+Indexed in-memory view of a Moodle XML question file.
+
+QuestionBank.load() parses the file once and indexes the questions by
+name, type and category (the path of the category question before them,
+as Moodle assigns it on import), and their dataset_definition elements by
+variable name, both per question and across the file. Lookups are dict
+accesses instead of findall() walks over the tree.
+
+The elements are the parsed ones, so transforms edit them in place.
+Questions and dataset definitions added through add() and add_dataset()
+are indexed as well; write() streams the bank out with moodle_xml.
+"""
+
+import xml.etree.ElementTree as ET
+
+import moodle_xml
+
+
+class QuestionBank:
+    """Questions of one <quiz> document with name, type, category and variable indexes."""
+
+    def __init__(self, root):
+        self.root = root
+        self.questions = []
+        self.by_name = {}
+        self.by_type = {}
+        self.by_category = {}
+        self._datasets = {}
+        self._by_variable = {}
+        self._category = None
+        for question in root.findall("question"):
+            self._index(question)
+
+    @classmethod
+    def load(cls, path):
+        """Parse a Moodle XML file into a QuestionBank."""
+        return cls(ET.parse(path).getroot())
+
+    def _index(self, question):
+        kind = question.get("type")
+        if kind == "category":
+            self._category = question.findtext("category/text")
+            return
+        self.questions.append(question)
+        self.by_name.setdefault(question.findtext("name/text"), question)
+        self.by_type.setdefault(kind, []).append(question)
+        self.by_category.setdefault(self._category, []).append(question)
+        self._datasets[question] = {}
+        for dd in question.iterfind("dataset_definitions/dataset_definition"):
+            self._index_dataset(question, dd)
+
+    def _index_dataset(self, question, dd):
+        name = dd.findtext("name/text")
+        self._datasets[question][name] = dd
+        self._by_variable.setdefault(name, []).append(dd)
+
+    def question(self, name):
+        """The first question called `name`, or None."""
+        return self.by_name.get(name)
+
+    def of_type(self, kind):
+        """Questions of a Moodle type ('calculated', 'multichoice', ...), in document order."""
+        return self.by_type.get(kind, [])
+
+    def in_category(self, path):
+        """Questions under a category path ('$course$/top/...'), in document order."""
+        return self.by_category.get(path, [])
+
+    def variables(self):
+        """Names of all dataset variables in the file."""
+        return self._by_variable.keys()
+
+    def datasets(self, question):
+        """{variable: dataset_definition} of one question."""
+        return self._datasets[question]
+
+    def dataset(self, question, variable):
+        """The question's dataset_definition of `variable`, or None."""
+        return self._datasets[question].get(variable)
+
+    def definitions(self, variable):
+        """Every dataset_definition of `variable` in the file."""
+        return self._by_variable.get(variable, [])
+
+    def add(self, question):
+        """Append a question at the end of the document; it is indexed under the last category."""
+        self.root.append(question)
+        self._index(question)
+        return question
+
+    def add_dataset(self, question, dd):
+        """Append a dataset_definition to an indexed question."""
+        definitions = question.find("dataset_definitions")
+        if definitions is None:
+            definitions = ET.SubElement(question, "dataset_definitions")
+        definitions.append(dd)
+        self._index_dataset(question, dd)
+        return dd
+
+    def write(self, path, declaration=moodle_xml.DECLARATION):
+        """Stream the document to `path` with moodle_xml."""
+        moodle_xml.write_quiz(path, self.root, declaration)
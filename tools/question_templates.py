@@ -0,0 +1,133 @@
+"""
+Question templates for the Moodle XML generators.
+
+calculated_question() returns a <question type="calculated"> in Moodle's
+export layout. Its static part (grading, numbering, combined feedback,
+answer and unit settings) is built once per options set and deep-copied
+for every question; only the name, texts, grade, formula and tolerance
+are filled in. add_dataset() appends a dataset_definition the same way.
+
+randomize_homework, both exam generators and update_xml_formulas build
+their calculated questions here, so they share one layout and differ only
+in the options they pass.
+"""
+
+import functools
+import xml.etree.ElementTree as ET
+
+# Skeleton options and their defaults, as Moodle XML text
+CALCULATED_OPTIONS = {
+    "penalty": "0.3333333",
+    "synchronize": "0",
+    "shuffleanswers": "0",
+    "tolerancetype": "2",
+    "correctanswerformat": "1",
+    "correctanswerlength": "4",
+    "unitpenalty": "0.1000000",
+}
+_DEFAULT_KEY = tuple(CALCULATED_OPTIONS.items())
+
+# Positions of the per-question slots in the skeletons; indexing is cheaper
+# than find() and the layout is fixed by the builders below
+_NAME, _QUESTIONTEXT, _GENERALFEEDBACK, _DEFAULTGRADE, _ANSWER = 0, 1, 2, 3, 14
+_DD_NAME, _DD_MINIMUM, _DD_MAXIMUM, _DD_DECIMALS, _DD_ITEMCOUNT, _DD_NUMBER, _DD_ITEMS = 1, 4, 5, 6, 7, 8, 9
+
+
+def _text_element(parent, tag, text=None, **attrib):
+    # <tag><text>text</text></tag>, Moodle's wrapper for strings
+    el = ET.SubElement(parent, tag, **attrib)
+    ET.SubElement(el, "text").text = text
+    return el
+
+
+@functools.lru_cache(maxsize=None)
+def _calculated_skeleton(options):
+    o = dict(options)
+    q = ET.Element("question", type="calculated")
+    _text_element(q, "name")
+    _text_element(q, "questiontext", format="html")
+    _text_element(q, "generalfeedback", format="html")
+    ET.SubElement(q, "defaultgrade")
+    ET.SubElement(q, "penalty").text = o["penalty"]
+    ET.SubElement(q, "hidden").text = "0"
+    ET.SubElement(q, "idnumber")
+    ET.SubElement(q, "synchronize").text = o["synchronize"]
+    ET.SubElement(q, "single").text = "0"
+    ET.SubElement(q, "answernumbering").text = "abc"
+    ET.SubElement(q, "shuffleanswers").text = o["shuffleanswers"]
+    for tag in ("correctfeedback", "partiallycorrectfeedback", "incorrectfeedback"):
+        _text_element(q, tag)
+
+    answer = ET.SubElement(q, "answer", fraction="100")
+    ET.SubElement(answer, "text")
+    ET.SubElement(answer, "tolerance")
+    for tag in ("tolerancetype", "correctanswerformat", "correctanswerlength"):
+        ET.SubElement(answer, tag).text = o[tag]
+    _text_element(answer, "feedback", format="html")
+
+    ET.SubElement(q, "unitgradingtype").text = "0"
+    ET.SubElement(q, "unitpenalty").text = o["unitpenalty"]
+    ET.SubElement(q, "showunits").text = "3"
+    ET.SubElement(q, "unitsleft").text = "0"
+    ET.SubElement(q, "dataset_definitions")
+    return q
+
+
+def calculated_question(name, questiontext, formula, tolerance, grade=1, generalfeedback=None,
+                        **options):
+    """A <question type="calculated"> with empty <dataset_definitions>.
+
+    `options` override CALCULATED_OPTIONS; values are written with str().
+    """
+    key = _DEFAULT_KEY
+    if options:
+        unknown = set(options) - set(CALCULATED_OPTIONS)
+        if unknown:
+            raise TypeError(f"unknown calculated question option(s): {', '.join(sorted(unknown))}")
+        key = tuple((option, str(options.get(option, default)))
+                    for option, default in CALCULATED_OPTIONS.items())
+
+    q = _calculated_skeleton(key).__deepcopy__({})
+    q[_NAME][0].text = name
+    q[_QUESTIONTEXT][0].text = questiontext
+    q[_GENERALFEEDBACK][0].text = generalfeedback
+    q[_DEFAULTGRADE].text = f"{float(grade):.7f}"
+    answer = q[_ANSWER]
+    answer[0].text = formula
+    answer[1].text = str(tolerance)
+    return q
+
+
+@functools.lru_cache(maxsize=None)
+def _dataset_skeleton(status):
+    dd = ET.Element("dataset_definition")
+    _text_element(dd, "status", status)
+    _text_element(dd, "name")
+    ET.SubElement(dd, "type").text = "calculated"
+    _text_element(dd, "distribution", "uniform")
+    for tag in ("minimum", "maximum", "decimals"):
+        _text_element(dd, tag)
+    ET.SubElement(dd, "itemcount")
+    ET.SubElement(dd, "number_of_items")
+    ET.SubElement(dd, "dataset_items")
+    return dd
+
+
+def add_dataset(question, name, minimum, maximum, decimals, values, status="private"):
+    """Append a dataset_definition to a calculated_question()'s <dataset_definitions>.
+
+    `minimum`, `maximum` and the item `values` are the printed strings.
+    """
+    dd = _dataset_skeleton(status).__deepcopy__({})
+    dd[_DD_NAME][0].text = name
+    dd[_DD_MINIMUM][0].text = minimum
+    dd[_DD_MAXIMUM][0].text = maximum
+    dd[_DD_DECIMALS][0].text = str(decimals)
+    dd[_DD_ITEMCOUNT].text = dd[_DD_NUMBER].text = str(len(values))
+    items = dd[_DD_ITEMS]
+    for i, value in enumerate(values, 1):
+        item = ET.SubElement(items, "dataset_item")
+        ET.SubElement(item, "number").text = str(i)
+        ET.SubElement(item, "value").text = value
+    question[-1].append(dd)
+    return dd
@@ -11,13 +11,19 @@ This version uses a GLOBAL DATASET MATRIX so that all quizzes share
 the same random values for shared variables (e.g. tw_in).
 
 Usage:
-    python tools/randomize_homework.py
+    python tools/randomize_homework.py [--shared-datasets]
+
+--shared-datasets writes variables used identically by several questions
+of a quiz once, as Moodle shared datasets (see moodle_xml.share_datasets).
 """
 
+import argparse
 import random
 import os
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
+
+import moodle_xml
+from question_templates import add_dataset, calculated_question
 
 random.seed(2025)
 
@@ -25,6 +31,7 @@ OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)),
                           "Cwiczenia", "homework")
 
 N_ITEMS = 50  # number of pre-generated dataset values
+SHARED_DATASETS = False  # set by --shared-datasets
 
 
 # ─────────────────────────────────────────────
@@ -118,40 +125,6 @@ def generate_global_data():
     return data
 
 
-def add_dataset_def(parent, name, vmin, vmax, decimals, items):
-    """Add a <dataset_definition> element to XML parent."""
-    dd = ET.SubElement(parent, "dataset_definition")
-
-    status = ET.SubElement(dd, "status")
-    ET.SubElement(status, "text").text = "private"
-
-    name_el = ET.SubElement(dd, "name")
-    ET.SubElement(name_el, "text").text = name
-
-    ET.SubElement(dd, "type").text = "calculated"
-
-    dist = ET.SubElement(dd, "distribution")
-    ET.SubElement(dist, "text").text = "uniform"
-
-    mn = ET.SubElement(dd, "minimum")
-    ET.SubElement(mn, "text").text = fmt_val(vmin, decimals)
-
-    mx = ET.SubElement(dd, "maximum")
-    ET.SubElement(mx, "text").text = fmt_val(vmax, decimals)
-
-    dec = ET.SubElement(dd, "decimals")
-    ET.SubElement(dec, "text").text = str(decimals)
-
-    ET.SubElement(dd, "itemcount").text = str(len(items))
-    ET.SubElement(dd, "number_of_items").text = str(len(items))
-
-    di_parent = ET.SubElement(dd, "dataset_items")
-    for i, val in enumerate(items, 1):
-        di = ET.SubElement(di_parent, "dataset_item")
-        ET.SubElement(di, "number").text = str(i)
-        ET.SubElement(di, "value").text = fmt_val(val, decimals)
-
-
 def build_calculated_question(
     name, question_html, formula, tolerance, tolerance_type,
     variables_map, global_data, defaultgrade, penalty="0.1000000",
@@ -163,60 +136,22 @@ def build_calculated_question(
     variables_map: dict mapping local XML placeholder name -> global data key
                    e.g. {"t1": "cw01_t_otoczenia"}
     """
-    q = ET.Element("question", type="calculated")
-
-    # Name
-    n = ET.SubElement(q, "name")
-    ET.SubElement(n, "text").text = name
-
-    # Question text
-    qt = ET.SubElement(q, "questiontext", format="html")
-    ET.SubElement(qt, "text").text = question_html
+    q = calculated_question(
+        name, question_html, formula, tolerance, grade=defaultgrade,
+        generalfeedback=general_feedback_html or "", penalty=penalty,
+        shuffleanswers=1, tolerancetype=tolerance_type,
+        correctanswerformat=correct_answer_format,
+        correctanswerlength=correct_answer_length, unitpenalty="1.0000000")
 
-    # General feedback
-    gf = ET.SubElement(q, "generalfeedback", format="html")
-    ET.SubElement(gf, "text").text = general_feedback_html or ""
-
-    # Grades
-    ET.SubElement(q, "defaultgrade").text = f"{float(defaultgrade):.7f}"
-    ET.SubElement(q, "penalty").text = penalty
-    ET.SubElement(q, "hidden").text = "0"
-    ET.SubElement(q, "idnumber")
-    ET.SubElement(q, "synchronize").text = "0"
-    ET.SubElement(q, "single").text = "0"
-    ET.SubElement(q, "answernumbering").text = "abc"
-    ET.SubElement(q, "shuffleanswers").text = "1"
-    for fb_tag in ("correctfeedback", "partiallycorrectfeedback", "incorrectfeedback"):
-        fb = ET.SubElement(q, fb_tag)
-        ET.SubElement(fb, "text")
-
-    # Answer with formula
-    ans = ET.SubElement(q, "answer", fraction="100")
-    ET.SubElement(ans, "text").text = formula
-    ET.SubElement(ans, "tolerance").text = str(tolerance)
-    ET.SubElement(ans, "tolerancetype").text = str(tolerance_type)
-    ET.SubElement(ans, "correctanswerformat").text = str(correct_answer_format)
-    ET.SubElement(ans, "correctanswerlength").text = str(correct_answer_length)
-    fb = ET.SubElement(ans, "feedback", format="html")
-    ET.SubElement(fb, "text")
-
-    # Unit settings
-    ET.SubElement(q, "unitgradingtype").text = "0"
-    ET.SubElement(q, "unitpenalty").text = "1.0000000"
-    ET.SubElement(q, "showunits").text = "3"
-    ET.SubElement(q, "unitsleft").text = "0"
-
-    # Dataset definitions
-    dds = ET.SubElement(q, "dataset_definitions")
-    
     # Iterate over required variables for this question
     for local_name, global_key in variables_map.items():
         if global_key not in global_data:
             raise KeyError(f"Missing global key: {global_key} for local var: {local_name}")
         
         g_var = global_data[global_key]
-        add_dataset_def(dds, local_name, g_var["min"], g_var["max"],
-                        g_var["dec"], g_var["items"])
+        dec = g_var["dec"]
+        add_dataset(q, local_name, fmt_val(g_var["min"], dec), fmt_val(g_var["max"], dec),
+                    dec, [fmt_val(val, dec) for val in g_var["items"]])
 
     return q
 
@@ -268,29 +203,12 @@ def build_category(path):
     return q
 
 
-def prettify_xml(root):
-    """Return a pretty-printed XML string."""
-    rough = ET.tostring(root, encoding="unicode", xml_declaration=False)
-    rough = '<?xml version="1.0" encoding="UTF-8"?>\n' + rough
-    dom = minidom.parseString(rough)
-    pretty = dom.toprettyxml(indent="    ", encoding=None)
-    lines = pretty.split("\n")
-    if lines[0].startswith("<?xml"):
-        lines[0] = '<?xml version="1.0" encoding="UTF-8"?>'
-    return "\n".join(lines)
-
-
 def write_quiz(filename, questions):
-    """Write a list of question elements to a quiz XML file."""
-    root = ET.Element("quiz")
-    for q in questions:
-        root.append(q)
-
-    xml_str = prettify_xml(root)
+    """Stream a list of question elements to a quiz XML file."""
     filepath = os.path.join(OUTPUT_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(xml_str)
-    print(f"  → {filepath}")
+    dropped = moodle_xml.share_datasets(questions) if SHARED_DATASETS else 0
+    moodle_xml.write_quiz(filepath, questions)
+    print(f"  → {filepath}" + (f" (wspólne zbiory danych: -{dropped} dataset_item)" if dropped else ""))
 
 
 # ─────────────────────────────────────────────
@@ -301,7 +219,7 @@ def generate_cw01(global_data):
     """Ćw. 1 — Dobór sprężarki"""
     # Mapping local variable names to global keys
     var_map = {
-        "V": "cw01_V",
+        "V_zb": "cw01_V",
         "patm_mmHg": "patm_mmHg",
         "t1": "cw01_t_otoczenia",
         "p_full": "p_full",
@@ -314,7 +232,7 @@ def generate_cw01(global_data):
         build_calculated_question(
             name="Ćw1 Zad. dom. – Masa powietrza w zbiorniku pustym [kg]",
             question_html=(
-                '<![CDATA[<p>Zbiornik o objętości \\( V = \\) <b>{V}</b> m³ '
+                '<![CDATA[<p>Zbiornik o objętości \\( V_zb = \\) <b>{V_zb}</b> m³ '
                 'zawiera powietrze przy ciśnieniu atmosferycznym '
                 '\\( p_{{atm}} = \\) <b>{patm_mmHg}</b> mmHg '
                 'i temperaturze \\( t = \\) <b>{t1}</b>°C.</p>'
@@ -322,9 +240,9 @@ def generate_cw01(global_data):
                 'Przyjmij \\( R = 287 \\text{{ J/(kg·K)}} \\).</p>'
                 '<p>Wynik podaj w <strong>kg</strong> '
                 '(zaokrąglij do 1 miejsca po przecinku).</p>'
-                '<p><em>Wskazówka:</em> \\( pV = mRT \\)</p>]]>'
+                '<p><em>Wskazówka:</em> \\( pV_zb = mRT \\)</p>]]>'
             ),
-            formula="({patm_mmHg} * 133.322) * {V} / (287 * ({t1} + 273.15))",
+            formula="({patm_mmHg} * 133.322) * {V_zb} / (287 * ({t1} + 273.15))",
             tolerance=2, tolerance_type=2,
             variables_map=var_map, global_data=global_data, defaultgrade=2
         ),
@@ -332,7 +250,7 @@ def generate_cw01(global_data):
         build_calculated_question(
             name="Ćw1 Zad. dom. – Masa powietrza w zbiorniku pełnym [kg]",
             question_html=(
-                '<![CDATA[<p>Zbiornik o objętości \\( V = \\) <b>{V}</b> m³ '
+                '<![CDATA[<p>Zbiornik o objętości \\( V_zb = \\) <b>{V_zb}</b> m³ '
                 'został naładowany sprężonym powietrzem do ciśnienia '
                 '\\( p = \\) <b>{p_full}</b> bar (abs) '
                 'i temperatury \\( t = \\) <b>{t_full}</b>°C.</p>'
@@ -341,7 +259,7 @@ def generate_cw01(global_data):
                 '<p>Wynik podaj w <strong>kg</strong> '
                 '(zaokrąglij do 1 miejsca po przecinku).</p>]]>'
             ),
-            formula="{p_full} * 100000 * {V} / (287 * ({t_full} + 273.15))",
+            formula="{p_full} * 100000 * {V_zb} / (287 * ({t_full} + 273.15))",
             tolerance=2, tolerance_type=2,
             variables_map=var_map, global_data=global_data, defaultgrade=2
         ),
@@ -349,7 +267,7 @@ def generate_cw01(global_data):
         build_calculated_question(
             name="Ćw1 Zad. dom. – Wydajność masowa sprężarki [kg/h]",
             question_html=(
-                '<![CDATA[<p>Zbiornik o objętości \\( V = \\) <b>{V}</b> m³ '
+                '<![CDATA[<p>Zbiornik o objętości \\( V_zb = \\) <b>{V_zb}</b> m³ '
                 'musi być napompowany od ciśnienia atmosferycznego '
                 '(\\( p_{{atm}} = \\) <b>{patm_mmHg}</b> mmHg, '
                 '\\( t = \\) <b>{t1}</b>°C) '
@@ -358,12 +276,12 @@ def generate_cw01(global_data):
                 '\\( t = \\) <b>{t_full}</b>°C) '
                 'w czasie 1 godziny.</p>'
                 '<p>Oblicz wymaganą wydajność masową sprężarki '
-                '\\( \\dot{{m}} \\) w <strong>kg/h</strong>.</p>'
+                '\\( \\dot{m} \\) w <strong>kg/h</strong>.</p>'
                 '<p>Wynik zaokrąglij do 1 miejsca po przecinku.</p>]]>'
             ),
             formula=(
-                "{p_full} * 100000 * {V} / (287 * ({t_full} + 273.15)) "
-                "- ({patm_mmHg} * 133.322) * {V} / (287 * ({t1} + 273.15))"
+                "{p_full} * 100000 * {V_zb} / (287 * ({t_full} + 273.15)) "
+                "- ({patm_mmHg} * 133.322) * {V_zb} / (287 * ({t1} + 273.15))"
             ),
             tolerance=2, tolerance_type=2,
             variables_map=var_map, global_data=global_data, defaultgrade=2
@@ -377,12 +295,12 @@ def generate_cw01(global_data):
                 'Warunki ssania: \\( p_{{atm}} = \\) <b>{patm_mmHg}</b> mmHg, '
                 '\\( T = \\) <b>{t1}</b>°C.</p>'
                 '<p>Oblicz wymaganą wydajność objętościową sprężarki '
-                'w warunkach ssania \\( \\dot{{V}} \\) w <strong>m³/h</strong>.</p>'
+                'w warunkach ssania \\( \\dot{V} \\) w <strong>m³/h</strong>.</p>'
                 '<p>Wynik zaokrąglij do całości.</p>]]>'
             ),
             formula=(
-                "({p_full} * 100000 * {V} / (287 * ({t_full} + 273.15)) "
-                "- ({patm_mmHg} * 133.322) * {V} / (287 * ({t1} + 273.15))) "
+                "({p_full} * 100000 * {V_zb} / (287 * ({t_full} + 273.15)) "
+                "- ({patm_mmHg} * 133.322) * {V_zb} / (287 * ({t1} + 273.15))) "
                 "* 287 * ({t1} + 273.15) / ({patm_mmHg} * 133.322)"
             ),
             tolerance=3, tolerance_type=2,
@@ -454,7 +372,7 @@ def generate_cw02(global_data):
                 '<p>Oblicz strumień objętościowy wody w <strong>l/min</strong>.</p>'
                 '<p>Wynik zaokrąglij do 1 miejsca po przecinku.</p>]]>'
             ),
-            formula="{Qch} * {eta_odz} / 100 * 1000 / (4190 * ({tw_out} - {tw_in})) * 60 * 1000",
+            formula="{Qch} * {eta_odz} / 100 * 1000 / (4190 * ({tw_out} - {tw_in})) * 60",
             tolerance=3, tolerance_type=2,
             variables_map=var_map, global_data=global_data, defaultgrade=3
         ),
@@ -1024,7 +942,13 @@ def generate_cw07(global_data):
 # Main
 # ─────────────────────────────────────────────
 
-def main():
+def main(argv=None):
+    global SHARED_DATASETS
+    parser = argparse.ArgumentParser(description="Randomized Moodle homework quizzes (cw01-cw07).")
+    parser.add_argument("--shared-datasets", action="store_true",
+                        help="emit variables used by several questions once, as shared datasets")
+    SHARED_DATASETS = parser.parse_args(argv).shared_datasets
+
     print("Generowanie quizów domowych z GLOBALNYMI zmiennymi (v2)...")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
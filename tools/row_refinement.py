@@ -0,0 +1,124 @@
+"""
+Adaptive row selection for the saturation tables.
+
+Instead of fixed steps, the rows of a refined table are picked from a fine
+candidate grid over the same range (0.1 K steps, or 1.0-9.9 mantissas per
+pressure decade): select_rows() keeps the fewest candidates such that
+linear interpolation between neighbouring rows reproduces every candidate
+in between, for every printed column, within a relative tolerance. Rows
+thin out where the properties are nearly linear and crowd together where
+they are not, e.g. v'' and r towards the critical point.
+
+Candidates alone do not bound the error between them: towards the
+critical point one candidate step (10 bar above 100 bar) can hold most
+of the drop of r. split_rows() therefore evaluates the EOS at the
+midpoint of every kept interval and inserts the midpoint as a row where
+interpolation misses the tolerance there, until every midpoint passes or
+the interval is one printed digit wide.
+"""
+
+import numpy as np
+
+# Values below this fraction of a column's largest magnitude are measured
+# against that floor (h' and s' pass through zero at the reference state)
+FLOOR = 1e-3
+
+
+def fmt_step(val, precision):
+    """One unit in the last digit that fmt(val, precision) prints."""
+    a = np.abs(val)
+    decimals = np.where((a < 0.001) & (a != 0), 6,
+               np.where((a < 0.1) & (a != 0), 5,
+               np.where(a >= 1000, 0, precision)))
+    return 10.0 ** -decimals
+
+
+def candidates(kind, values):
+    """Fine candidate grid spanning the rows `values` of a 'sat_t' or 'sat_p' spec."""
+    lo, hi = float(np.min(values)), float(np.max(values))
+    if kind == "sat_t":
+        grid = np.arange(np.ceil(lo * 10), np.floor(hi * 10) + 1) / 10
+    else:
+        decades = np.arange(np.floor(np.log10(lo)), np.ceil(np.log10(hi)) + 1)
+        grid = np.round(np.outer(10.0 ** decades, np.arange(10, 100) / 10).ravel(), 10)
+    return np.unique(np.concatenate([[lo, hi], grid[(grid >= lo) & (grid <= hi)]]))
+
+
+def _fits(x, y, scale, rtol, i, j):
+    # Linear interpolation between rows i and j against every row in between
+    if j - i < 2:
+        return True
+    w = (x[i + 1:j] - x[i]) / (x[j] - x[i])
+    interp = y[:, i, None] * (1 - w) + y[:, j, None] * w
+    return bool(np.all(np.abs(interp - y[:, i + 1:j]) <= rtol * scale[:, i + 1:j]))
+
+
+def select_rows(x, y, rtol):
+    """Indices of the rows of `x` (candidates, ascending) to keep.
+
+    `y` holds the printed columns, shape (columns, len(x)). Every kept
+    span is checked, so the tolerance holds for all candidates; the span
+    length is found by doubling and bisection from each kept row.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    magnitude = np.abs(y)
+    scale = np.maximum(magnitude, FLOOR * magnitude.max(axis=1, keepdims=True))
+    last = len(x) - 1
+
+    rows, i = [0], 0
+    while i < last:
+        good, span = i + 1, 2
+        while i + span < last and _fits(x, y, scale, rtol, i, i + span):
+            good, span = i + span, span * 2
+        bad = min(i + span, last)
+        if bad == last and _fits(x, y, scale, rtol, i, bad):
+            good = bad
+        while bad - good > 1:
+            mid = (good + bad) // 2
+            if _fits(x, y, scale, rtol, i, mid):
+                good = mid
+            else:
+                bad = mid
+        rows.append(good)
+        i = good
+    return np.array(rows)
+
+
+def split_rows(x, y, rtol, evaluate, resolution):
+    """Rows `x`, `y` with interval midpoints inserted until all of them pass `rtol`.
+
+    `evaluate(x)` returns the printed columns, shape (columns, len(x)), for
+    new row inputs; `resolution(x)` is the printed step of a row input,
+    and midpoints are rounded to it so that inserted rows print exactly.
+    Values are measured against the same floor as in select_rows(). A
+    midpoint the EOS cannot evaluate is not inserted.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    floor = FLOOR * np.abs(y).max(axis=1, keepdims=True)
+    todo = np.ones(len(x) - 1, dtype=bool)
+    while todo.any():
+        i = np.flatnonzero(todo)
+        mid = (x[i] + x[i + 1]) / 2
+        step = resolution(mid)
+        mid = np.round(mid / step) * step
+        splittable = (mid > x[i]) & (mid < x[i + 1])
+        i, mid = i[splittable], mid[splittable]
+        if not len(i):
+            break
+
+        exact = evaluate(mid)
+        w = (mid - x[i]) / (x[i + 1] - x[i])
+        interp = y[:, i] * (1 - w) + y[:, i + 1] * w
+        bad = np.any(np.abs(interp - exact) > rtol * np.maximum(np.abs(exact), floor), axis=0)
+        bad &= ~np.isnan(exact).any(axis=0)
+
+        x = np.concatenate([x, mid[bad]])
+        y = np.concatenate([y, exact[:, bad]], axis=1)
+        inserted = np.concatenate([np.zeros(len(x) - bad.sum(), dtype=bool), np.ones(bad.sum(), dtype=bool)])
+        order = np.argsort(x, kind="stable")
+        x, y, inserted = x[order], y[:, order], inserted[order]
+        # Only the halves of split intervals still need a midpoint check
+        todo = inserted[:-1] | inserted[1:]
+    return x, y
@@ -0,0 +1,176 @@
+"""
+Shared table-data stage for the HTML table generators.
+
+Every table in fluid_registry.TABLES is evaluated once into NumPy structured arrays with
+its metadata (a Table); generate_tables_coolprop and generate_moodle_tables
+only format these, so both outputs show the same numbers and the EOS work
+is done once per process.
+
+Row chunks of all tables are evaluated as parallel_build parts, so
+build_tables(jobs=N) spreads the EOS work over N processes.
+
+refined_specs(specs, rtol) turns the saturation tables into adaptive ones:
+their rows are picked by row_refinement from a fine candidate grid over
+the same range, for a linear-interpolation error of at most `rtol`, and
+intervals whose EOS midpoint misses `rtol` are split with extra rows;
+refined specs carry "rtol" and hold the candidate rows.
+
+"""
+
+import numpy as np
+
+from fluid_registry import TABLES
+from parallel_build import row_chunks, run_parts
+from property_engine import compressed_liquid_grid, saturation_rows, superheated_grid
+from row_refinement import candidates, fmt_step, select_rows, split_rows
+
+# Bump when the evaluation or the Table layout changes (build_manifest hashes it)
+DATA_VERSION = 3
+
+_built = {}
+
+
+class Table:
+    """Columns of one property table and its metadata.
+
+    Saturation tables ('sat_p', 'sat_t') have `p` [bar] or `t` [°C] as the
+    row inputs and `sat` as SATURATION_DTYPE rows. Superheated and
+    compressed-liquid tables ('superheated', 'compressed') have `p` [bar]
+    columns and `t` [°C] rows, `sat` with one saturation row per pressure,
+    `grid` with SUPERHEATED_DTYPE cells, the `liquid` or `vapour` mask of
+    the cells outside their phase and the `failed` cell mask. All property
+    values are SI.
+    """
+
+    def __init__(self, key, kind, fluid, p=None, t=None, sat=None, grid=None, liquid=None,
+                 vapour=None):
+        self.key = key
+        self.kind = kind
+        self.fluid = fluid
+        self.p = p
+        self.t = t
+        self.sat = sat
+        self.grid = grid
+        self.liquid = liquid
+        self.vapour = vapour
+        self.failed = None if grid is None else ~self.excluded & np.isnan(grid["v"])
+
+    @property
+    def excluded(self):
+        """Grid cells outside the table's phase, never evaluated."""
+        return self.vapour if self.kind == "compressed" else self.liquid
+
+
+def _sat_p_chunk(fluid, p_bar):
+    p_pa = np.asarray(p_bar, dtype=float) * 1e5
+    return saturation_rows(fluid, p=p_pa)
+
+
+def _sat_t_chunk(fluid, t_c):
+    t_k = np.asarray(t_c, dtype=float) + 273.15
+    return saturation_rows(fluid, t=t_k)
+
+
+def _superheated_chunk(fluid, p_bar, t_c):
+    # The t x p grid; liquid cells are masked out before the EOS is called
+    p_pa = np.asarray(p_bar, dtype=float) * 1e5
+    t_k = np.asarray(t_c, dtype=float) + 273.15
+    return superheated_grid(fluid, p_pa, t_k)
+
+
+def _compressed_chunk(fluid, p_bar, t_c):
+    # As _superheated_chunk, with the vapour cells masked out
+    p_pa = np.asarray(p_bar, dtype=float) * 1e5
+    t_k = np.asarray(t_c, dtype=float) + 273.15
+    return compressed_liquid_grid(fluid, p_pa, t_k)
+
+
+def _parts(spec):
+    kind, fluid = spec["kind"], spec["fluid"]
+    if kind == "sat_p":
+        return [(_sat_p_chunk, (fluid, chunk)) for _, chunk in row_chunks(spec["p"])]
+    if kind == "sat_t":
+        return [(_sat_t_chunk, (fluid, chunk)) for _, chunk in row_chunks(spec["t"])]
+    chunk_function = _compressed_chunk if kind == "compressed" else _superheated_chunk
+    return [(chunk_function, (fluid, spec["p"], chunk))
+            for _, chunk in row_chunks(spec["t"])]
+
+
+def _refine(kind, fluid, x, sat, rtol):
+    # Printed columns (°C for T) of the valid candidate rows decide the rows kept;
+    # the kept intervals are then split until their EOS midpoints pass as well
+    fields = [name for name in sat.dtype.names if name != ("p" if kind == "sat_p" else "T")]
+
+    def columns(rows):
+        return np.array([rows[name] - 273.15 if name == "T" else rows[name] for name in fields])
+
+    inserted = {}
+
+    def evaluate(x_new):
+        if kind == "sat_p":
+            rows = saturation_rows(fluid, p=x_new * 1e5)
+        else:
+            rows = saturation_rows(fluid, t=x_new + 273.15)
+        inserted.update(zip(x_new.tolist(), rows))
+        return columns(rows)
+
+    y = columns(sat)
+    valid = np.flatnonzero(~np.isnan(y).any(axis=0))
+    keep = valid[select_rows(x[valid], y[:, valid], rtol)]
+    precision = 3 if kind == "sat_p" else 2
+    x_kept, _ = split_rows(x[keep], y[:, keep], rtol, evaluate, lambda v: fmt_step(v, precision))
+
+    rows = dict(zip(x[keep].tolist(), sat[keep]))
+    rows.update(inserted)
+    return x_kept, np.array([rows[v] for v in x_kept.tolist()], dtype=sat.dtype)
+
+
+def _assemble(spec, chunks):
+    key, kind, fluid = spec["key"], spec["kind"], spec["fluid"]
+    if kind in ("sat_p", "sat_t"):
+        x, sat = np.asarray(spec["p" if kind == "sat_p" else "t"], dtype=float), np.concatenate(chunks)
+        if "rtol" in spec:
+            x, sat = _refine(kind, fluid, x, sat, spec["rtol"])
+        if kind == "sat_p":
+            return Table(key, kind, fluid, p=x, sat=sat)
+        return Table(key, kind, fluid, t=x, sat=sat)
+    mask = {"vapour" if kind == "compressed" else "liquid": np.concatenate([c[1] for c in chunks])}
+    return Table(key, kind, fluid,
+                 p=np.asarray(spec["p"], dtype=float), t=np.asarray(spec["t"], dtype=float),
+                 sat=chunks[0][0],
+                 grid=np.concatenate([c[2] for c in chunks]), **mask)
+
+
+def _evaluate(specs, jobs):
+    # {key: Table}; the row chunks of all specs go through one run_parts() call
+    parts, owners = [], []
+    for spec in specs:
+        for part in _parts(spec):
+            parts.append(part)
+            owners.append(spec["key"])
+    results = run_parts(parts, jobs)
+    return {spec["key"]: _assemble(spec, [r for r, key in zip(results, owners) if key == spec["key"]])
+            for spec in specs}
+
+
+def refined_specs(specs, rtol):
+    """Copies of `specs` with the saturation tables in adaptive-row mode."""
+    refined = []
+    for spec in specs:
+        if spec["kind"] in ("sat_p", "sat_t"):
+            name = "p" if spec["kind"] == "sat_p" else "t"
+            spec = dict(spec, rtol=rtol, **{name: candidates(spec["kind"], spec[name])})
+        refined.append(spec)
+    return refined
+
+
+def build_tables(specs=TABLES, jobs=1):
+    """Evaluate the tables (once per mode and process); returns {key: Table}."""
+    def memo(spec):
+        return spec["key"], spec.get("rtol")
+
+    todo = [spec for spec in specs if memo(spec) not in _built]
+    tables = _evaluate(todo, jobs)
+    for spec in todo:
+        _built[memo(spec)] = tables[spec["key"]]
+    return {spec["key"]: _built[memo(spec)] for spec in specs}
@@ -0,0 +1,138 @@
+"""
+Machine-readable sidecars for the table build.
+
+write_sidecars() stores every table_data.Table, by default in SIDECAR_DIR
+(Cwiczenia/xml/tablice_dane, next to the HTML), as
+
+    <key>.npz   the structured arrays in SI units, lossless, with metadata
+    <key>.csv   the same values in the printed table units, full precision
+
+plus an index.json that lists the tables, their columns and units.
+read_table() loads a .npz back into a Table, so downstream scripts
+(verify_nist.py) read numbers directly instead of parsing the HTML.
+"""
+
+import csv
+import json
+import os
+
+import CoolProp
+import numpy as np
+
+import property_engine
+from build_manifest import data_digest
+from table_data import Table
+
+SIDECAR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "Cwiczenia", "xml", "tablice_dane")
+INDEX_FILE = "index.json"
+
+# CSV columns: (header, source array, field, scale, offset); SI -> table units
+SATURATION_CSV = [
+    ("v' [dm³/kg]", "sat", "v_liq", 1e3, 0),
+    ("v'' [m³/kg]", "sat", "v_vap", 1, 0),
+    ("ρ'' [kg/m³]", "sat", "rho_vap", 1, 0),
+    ("h' [kJ/kg]", "sat", "h_liq", 1e-3, 0),
+    ("h'' [kJ/kg]", "sat", "h_vap", 1e-3, 0),
+    ("r [kJ/kg]", "sat", "r", 1e-3, 0),
+    ("s' [kJ/(kg·K)]", "sat", "s_liq", 1e-3, 0),
+    ("s'' [kJ/(kg·K)]", "sat", "s_vap", 1e-3, 0),
+]
+CSV_COLUMNS = {
+    "sat_p": [("p [bar]", "p", None, 1, 0), ("t_sat [°C]", "sat", "T", 1, -273.15)] + SATURATION_CSV,
+    "sat_t": [("t [°C]", "t", None, 1, 0), ("p_sat [kPa]", "sat", "p", 1e-3, 0)] + SATURATION_CSV,
+    # Long format, one row per (t, p) cell
+    "superheated": [
+        ("t [°C]", "t", None, 1, 0), ("p [bar]", "p", None, 1, 0),
+        ("t_sat [°C]", "sat", "T", 1, -273.15),
+        ("v [m³/kg]", "grid", "v", 1, 0), ("h [kJ/kg]", "grid", "h", 1e-3, 0),
+        ("s [kJ/(kg·K)]", "grid", "s", 1e-3, 0),
+    ],
+}
+CSV_COLUMNS["compressed"] = [("v [dm³/kg]", "grid", "v", 1e3, 0) if c[2] == "v" else c
+                             for c in CSV_COLUMNS["superheated"]]
+GRID_KINDS = ("superheated", "compressed")
+# Units of the .npz arrays (structured arrays: per field)
+NPZ_UNITS = {
+    "p": "bar",
+    "t": "°C",
+    "sat": {"T": "K", "p": "Pa", "v_liq": "m³/kg", "v_vap": "m³/kg", "rho_vap": "kg/m³",
+            "h_liq": "J/kg", "h_vap": "J/kg", "r": "J/kg", "s_liq": "J/(kg·K)", "s_vap": "J/(kg·K)"},
+    "grid": {"v": "m³/kg", "h": "J/kg", "s": "J/(kg·K)"},
+    "liquid": "bool",
+    "vapour": "bool",
+}
+ARRAYS = ("p", "t", "sat", "grid", "liquid", "vapour")
+
+
+def _csv_rows(table):
+    """Rows of the table in printed units; NaN cells become empty."""
+    columns = CSV_COLUMNS[table.kind]
+    if table.kind in GRID_KINDS:
+        t, p = np.meshgrid(table.t, table.p, indexing="ij")
+        arrays = {"t": t, "p": p, "sat": np.broadcast_to(table.sat, t.shape), "grid": table.grid}
+        outside = "vapour" if table.kind == "compressed" else "liquid"
+        status = np.where(table.excluded, outside, np.where(table.failed, "failed", "ok"))
+    else:
+        arrays = {"p": table.p, "t": table.t, "sat": table.sat}
+        status = None
+
+    values = []
+    for _, source, field, scale, offset in columns:
+        data = arrays[source] if field is None else arrays[source][field]
+        values.append((np.asarray(data, dtype=float) * scale + offset).ravel())
+    for i, row in enumerate(zip(*values)):
+        cells = ["" if np.isnan(x) else repr(float(x)) for x in row]
+        yield cells if status is None else cells + [status.ravel()[i]]
+
+
+def _headers(kind):
+    headers = [c[0] for c in CSV_COLUMNS[kind]]
+    return headers + ["state"] if kind in GRID_KINDS else headers
+
+
+def write_sidecars(tables, directory, specs=None):
+    """Write <key>.npz / <key>.csv for every Table plus index.json.
+
+    The index lists `specs` (table_data specs) when given, so an
+    incremental build can rewrite only the changed tables' files. Entries
+    built from specs carry the build_manifest data digest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    if specs is None:
+        listed = [{"key": key, "kind": table.kind, "fluid": table.fluid} for key, table in tables.items()]
+    else:
+        listed = [{"key": s["key"], "kind": s["kind"], "fluid": s["fluid"], "digest": data_digest(s)}
+                  for s in specs]
+    index = {"coolprop": CoolProp.__version__, "backend": property_engine.BACKEND,
+             "tables": [dict(entry, npz=f"{entry['key']}.npz", csv=f"{entry['key']}.csv",
+                             columns=_headers(entry["kind"])) for entry in listed]}
+
+    for key, table in tables.items():
+        meta = {"key": key, "kind": table.kind, "fluid": table.fluid, "units": NPZ_UNITS,
+                "coolprop": CoolProp.__version__, "backend": property_engine.BACKEND}
+        arrays = {name: getattr(table, name) for name in ARRAYS
+                  if getattr(table, name) is not None}
+        np.savez(os.path.join(directory, f"{key}.npz"), meta=np.array(json.dumps(meta)), **arrays)
+
+        with open(os.path.join(directory, f"{key}.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(_headers(table.kind))
+            writer.writerows(_csv_rows(table))
+
+    with open(os.path.join(directory, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, ensure_ascii=False)
+
+
+def read_index(directory):
+    """The index.json of a sidecar directory."""
+    with open(os.path.join(directory, INDEX_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_table(directory, key):
+    """Load <key>.npz back into a table_data.Table."""
+    with np.load(os.path.join(directory, f"{key}.npz")) as data:
+        meta = json.loads(str(data["meta"]))
+        arrays = {name: data[name] for name in ARRAYS if name in data}
+    return Table(meta["key"], meta["kind"], meta["fluid"], **arrays)
@@ -0,0 +1,69 @@
+"""Tests of the Moodle XML writer: shared-dataset layout and HTML fields."""
+
+import xml.etree.ElementTree as ET
+
+import moodle_xml
+from question_bank import QuestionBank
+from question_templates import add_dataset, calculated_question
+
+
+def _category(path):
+    q = ET.Element("question", type="category")
+    ET.SubElement(ET.SubElement(q, "category"), "text").text = path
+    return q
+
+
+def _question(name, datasets):
+    q = calculated_question(name, "<p>{x}</p>", "{x}", 0.01)
+    for variable, values in datasets.items():
+        add_dataset(q, variable, "1", "9", 0, values)
+    return q
+
+
+def _layout(dd):
+    return (dd.findtext("status/text"), dd.findtext("minimum/text"), dd.findtext("maximum/text"),
+            dd.findtext("decimals/text"), dd.findtext("itemcount"), dd.findtext("number_of_items"),
+            [item.findtext("value") for item in dd.iterfind("dataset_items/dataset_item")])
+
+
+def test_shared_dataset_items_written_once_per_category(tmp_path):
+    questions = [
+        _category("$course$/A"),
+        _question("q1", {"x": ["1", "2", "3"], "y": ["4", "5"]}),
+        _question("q2", {"x": ["1", "2", "3"], "y": ["6", "7"]}),
+        _question("q3", {"x": ["1", "2", "3"]}),
+        _category("$course$/B"),
+        _question("q4", {"x": ["1", "2", "3"]}),
+        _question("q5", {"x": ["1", "2", "3"]}),
+    ]
+    assert moodle_xml.share_datasets(questions) == 9
+
+    path = tmp_path / "quiz.xml"
+    moodle_xml.write_quiz(path, questions)
+    bank = QuestionBank.load(path)
+
+    # First use in a category creates the shared dataset with its items
+    full = ("shared", "1", "9", "0", "3", "3", ["1", "2", "3"])
+    linked = ("shared", "1", "9", "0", "3", "3", [])
+    for category in ("$course$/A", "$course$/B"):
+        first, *later = [bank.dataset(q, "x") for q in bank.in_category(category)]
+        assert _layout(first) == full
+        assert [_layout(dd) for dd in later] == [linked] * len(later)
+
+    # Different values under one name stay private, items and all
+    assert [_layout(dd)[0::6] for dd in bank.definitions("y")] == [
+        ("private", ["4", "5"]), ("private", ["6", "7"])]
+
+
+def test_html_fields_written_as_cdata(tmp_path):
+    question = _question("q", {})
+    question.find("generalfeedback/text").text = "<![CDATA[<p>a &amp; b</p>]]>"
+    path = tmp_path / "quiz.xml"
+    moodle_xml.write_quiz(path, [question])
+    written = path.read_text(encoding="utf-8")
+
+    # Short and long HTML alike, generator-wrapped text unwrapped once
+    assert "<text><![CDATA[<p>{x}</p>]]></text>" in written
+    assert "<text><![CDATA[<p>a &amp; b</p>]]></text>" in written
+    assert "&lt;" not in written
+    assert QuestionBank.load(path).question("q").findtext("questiontext/text") == "<p>{x}</p>"
@@ -1,35 +1,28 @@
-import re
 import random
 import requests
 import CoolProp.CoolProp as CP
-from bs4 import BeautifulSoup
+import numpy as np
 import pandas as pd
 import time
 
+# Sidecar exports written by the table generators
+from table_export import SIDECAR_DIR, read_index, read_table
+
 # Configuration
-HTML_FILE = "/Users/marekurbaniak/Documents/R/Termodynamika_quatro/Cwiczenia/xml/tablice_termodynamiczne.html"
 NIST_BASE_URL = "https://webbook.nist.gov/cgi/fluid.cgi"
 
-# Mapping: HTML Fluid Name -> NIST ID
+# Mapping: CoolProp Fluid Name -> NIST ID
 FLUID_MAP = {
-    "Woda": "C7732185",
+    "Water": "C7732185",
     "R134a": "C811972",
-    "R290": "C74986"
+    "R290": "C74986",
+    "Ammonia": "C7664417",
+    "CO2": "C124389",
+    "R32": "C75105"
 }
 
-def clean_val(s):
-    """Clean HTML string to float."""
-    if not s or "—" in s or "?" in s: return None
-    # Remove HTML tags if any
-    s = re.sub(r'<[^>]+>', '', s)
-    s = s.replace(',', '.').replace(' ', '').strip()
-    try:
-        if '·10' in s: # scientific notation handling if needed
-             parts = s.split('·10')
-             return float(parts[0]) * (10**int(parts[1]))
-        return float(s)
-    except:
-        return None
+# Table kind -> NIST query type
+NIST_TYPES = {"sat_p": "SatP", "sat_t": "SatT"}
 
 def get_nist_data(fluid_id, prop_type, p_bar=None, t_c=None):
     """Query NIST WebBook.
@@ -120,75 +113,46 @@ def get_nist_data(fluid_id, prop_type, p_bar=None, t_c=None):
         return None
 
 def verify_tables():
-    print("Reading HTML...")
-    # ... (rest of function as before, no changes needed for debug usually, but let's just update the get_nist_data logic)
+    print("Reading table sidecars...")
     
-    with open(HTML_FILE, "r", encoding="utf-8") as f:
-        soup = BeautifulSoup(f, "html.parser")
-        
-    tables = soup.find_all("div", class_="table-container")
+    index = read_index(SIDECAR_DIR)
     samples = []
     
     # 1. Collect potential rows
-    print(f"Found {len(tables)} tables.")
+    print(f"Found {len(index['tables'])} tables.")
     
-    for t_idx, container in enumerate(tables):
-        header_text = container.find("h3").get_text()
-        
-        # Identify Fluid
-        fluid = None
-        if "Woda" in header_text or "Para wodna" in header_text: fluid = "Woda"
-        elif "R134a" in header_text: fluid = "R134a"
-        elif "R290" in header_text: fluid = "R290"
-        
-        # Identify Type
-        t_type = None
-        if "nasycona (wg ciśnienia)" in header_text or "nasycony (wg ciśnienia)" in header_text: t_type = "SatP"
-        elif "nasycona (wg temperatury)" in header_text or "nasycony (wg temperatury)" in header_text: t_type = "SatT"
-        elif "przegrzana" in header_text or "przegrzany" in header_text: t_type = "IsoBar"
-        
-        if not fluid or not t_type: continue
+    for entry in index["tables"]:
+        t_type = NIST_TYPES.get(entry["kind"])
+        if entry["fluid"] not in FLUID_MAP or not t_type: continue
+        table = read_table(SIDECAR_DIR, entry["key"])
+        sat = table.sat
         
-        # Parse Rows
-        rows = container.find_all("tr")
-        data_rows = [r for r in rows if r.find("td")]
-        
-        for r in data_rows:
-            cols = r.find_all("td")
-            if not cols: continue
+        # Full-precision values in the printed units
+        for i in range(len(sat)):
+            if np.isnan(sat[i]['T']): continue
+            item = {
+                "fluid": entry["fluid"],
+                "type": t_type,
+                "table_name": entry["key"],
+            }
             
-            try:
-                item = {
-                    "fluid": fluid,
-                    "type": t_type,
-                    "table_name": header_text,
-                    "raw_row": r
+            if t_type == "SatP":
+                item["p_bar"] = float(table.p[i])
+                item["vals"] = {
+                    "v''": (float(sat[i]['v_vap']), "Volume (v)"),
+                    "h''": (float(sat[i]['h_vap']) / 1000, "Enthalpy (v)"),
+                    "s''": (float(sat[i]['s_vap']) / 1000, "Entropy (v)")
                 }
                 
-                if t_type == "SatP":
-                    item["p_bar"] = clean_val(cols[0].text)
-                    item["vals"] = {
-                        "v''": (clean_val(cols[3].text), "Volume (v)"), 
-                        "h''": (clean_val(cols[6].text), "Enthalpy (v)"), # Fixed key
-                        "s''": (clean_val(cols[9].text), "Entropy (v)")   # Fixed key
-                    }
-                    
-                elif t_type == "SatT":
-                    item["t_c"] = clean_val(cols[0].text)
-                    # HTML Col 1 is p_sat in kPa.
-                    p_kpa = clean_val(cols[1].text)
-                    
-                    item["vals"] = {
-                         "p_sat": (p_kpa/100.0 if p_kpa else None, "Pressure"),
-                         "h''": (clean_val(cols[6].text), "Enthalpy (v)"),
-                         "s''": (clean_val(cols[9].text), "Entropy (v)")
-                    }
-
-                if item.get("p_bar") or item.get("t_c") is not None:
-                     samples.append(item)
-            except Exception as e:
-                # print(e) 
-                continue
+            elif t_type == "SatT":
+                item["t_c"] = float(table.t[i])
+                item["vals"] = {
+                     "p_sat": (float(sat[i]['p']) / 1e5, "Pressure"),
+                     "h''": (float(sat[i]['h_vap']) / 1000, "Enthalpy (v)"),
+                     "s''": (float(sat[i]['s_vap']) / 1000, "Entropy (v)")
+                }
+            
+            samples.append(item)
 
     # 2. Select 20 random
     if len(samples) < 20: 
@@ -216,8 +180,8 @@ def verify_tables():
             continue
             
         # Compare
-        for prop_name, (val_html, nist_key_part) in item["vals"].items():
-            if val_html is None: continue
+        for prop_name, (val_table, nist_key_part) in item["vals"].items():
+            if val_table is None: continue
             
             # Find matching NIST key in the dict
             # NIST headers are tricky. Let's look for partial match in keys.
@@ -248,8 +212,8 @@ def verify_tables():
                     nist_val = None
                     
             if nist_val is not None:
-                diff_abs = abs(val_html - nist_val)
-                avg = (abs(val_html) + abs(nist_val)) / 2
+                diff_abs = abs(val_table - nist_val)
+                avg = (abs(val_table) + abs(nist_val)) / 2
                 if avg == 0: avg = 1
                 diff_rel = (diff_abs / avg) * 100
                 
@@ -257,7 +221,7 @@ def verify_tables():
                     "Table": item["table_name"],
                     "Point": f"p={item.get('p_bar')} bar" if item.get('p_bar') else f"t={item.get('t_c')} C",
                     "Property": prop_name,
-                    "HTML Value": val_html,
+                    "Table Value": val_table,
                     "NIST Value": round(nist_val, 5),
                     "Diff (%)": round(diff_rel, 4)
                 })